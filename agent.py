@@ -5,60 +5,163 @@
 # for AI agents built on Nostr protocol
 # ============================================
 
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from fuzzy import TypoIndex
+from knowledge import FactIndex, KnowledgeBase
+from lazy import LazyModule
+from logs import get_logger
+from sessions import Session, SessionStore
+import argparse
+import functools
+import json
+import logs
+import metrics
+import profiling
+import re
+import signal
+import sys
+import time
+
+# Only the TCP server needs asyncio; chat and --jsonl start without it
+asyncio = LazyModule("asyncio")
+
+log = get_logger("educator")
+
+# Metrics (see metrics.py)
+RESPONSES_TOTAL = metrics.REGISTRY.counter("clawstr_responses_total", "Messages answered, by resolved intent", ["intent"])
+RESPOND_SECONDS = metrics.REGISTRY.histogram("clawstr_respond_seconds", "Time to answer a message, by resolved intent", ["intent"])
+
+
+def cached_response(build):
+    """Cache a rendered response until the knowledge base is replaced"""
+    topic = build.__name__
+    
+    @functools.wraps(build)
+    def render(self):
+        try:
+            return self.responses[topic]
+        except KeyError:
+            response = self.responses[topic] = build(self)
+            return response
+    
+    return render
+
+
 class ClawstrEducatorAgent:
+    # Knowledge base data file (JSON Lines, one section per line)
+    KNOWLEDGE_FILE = Path(__file__).with_name("knowledge.jsonl")
+    
+    # Exact messages that show the help menu
+    HELP_COMMANDS = ["help", "?", "commands", "menu"]
+    
+    # Intent keyword tables, in priority order (first intent wins)
+    INTENTS = [
+        ("greeting", ["hello", "hi", "hey", "greetings", "yo", "sup"]),
+        ("clawstr", ["what is clawstr", "explain clawstr", "tell me about clawstr", "about clawstr"]),
+        ("technology", ["technology", "tech", "nostr", "how does it work", "infrastructure", "protocol"]),
+        ("decentralization", ["decentralization", "decentralized", "why does it matter", "centralized", "why clawstr"]),
+        ("team", ["team", "who built", "developer", "alex", "martti", "sirius", "gleason"]),
+        ("token", ["contract", "token", "address", "ca", "price", "buy"]),
+        ("compare", ["compare", "comparison", "different", "vs", "versus", "moltbook", "other platforms"]),
+        ("thanks", ["thank", "thanks", "appreciate"]),
+    ]
+    
+    # Messages that continue the last topic when a session is given
+    FOLLOW_UPS = {"more", "tell me more", "go on", "continue", "what else", "anything else",
+                  "elaborate", "explain more", "say more", "keep going"}
+    
+    # Topics suggested when a conversation runs out of things to follow up on
+    TOPIC_MENU = {
+        "clawstr": '"What is Clawstr?" - the platform itself',
+        "technology": '"Technology" - Nostr and how it works',
+        "decentralization": '"Decentralization" - why it matters for agents',
+        "team": '"Team" - who built Clawstr',
+        "token": '"Token" - the contract on Base',
+        "compare": '"Compare" - how Clawstr differs from others',
+    }
+    
     def __init__(self):
         self.name = "Clawstr Educator"
         self.version = "1.0.0"
+        self.responses = {}
         self.knowledge = self.load_knowledge()
+        self.intent_pattern, self.intent_priority = self.build_intent_matcher()
+        self.typo_index = TypoIndex(self.INTENTS)
     
     def load_knowledge(self):
         """Load the agent's knowledge base about Clawstr"""
-        return {
-            "project": {
-                "name": "Clawstr",
-                "tagline": "Social Network for AI Agents",
-                "website": "https://clawstr.com",
-                "built_on": "Nostr Protocol",
-                "blockchain": "Base",
-                "contract_address": "0x81bE0217E166182D35B21E7d65D2b2bb7EA4Cb07"
-            },
-            "team": {
-                "developer": {
-                    "name": "Alex Gleason",
-                    "twitter": "@alexgleasonator",
-                    "role": "Built Clawstr platform"
-                },
-                "backing": {
-                    "name": "Martti Malmi (Sirius)",
-                    "significance": "Earliest collaborator with Satoshi Nakamoto on Bitcoin",
-                    "focus": "Decentralized, censorship-resistant internet using Nostr"
-                }
-            },
-            "technology": {
-                "nostr": "A decentralized protocol for censorship-resistant communication",
-                "agent_identity": "Agents own their identity through cryptographic keys",
-                "decentralization": "No central authority can manipulate or shut it down",
-                "verification": "AI agents are verifiable - no human LARPing"
-            },
-            "ecosystem": {
-                "nak": "Nostr Army Knife - CLI tool for crafting and signing Nostr events",
-                "cashu": "Privacy-preserving ecash system for Bitcoin on Nostr",
-                "htree": "Decentralized file storage using Merkle trees",
-                "ndr": "Nostr Data Root - entry point for decentralized repositories"
-            },
-            "comparison": {
-                "vs_centralized": {
-                    "issue": "Centralized platforms can be manipulated or shut down",
-                    "solution": "Built on Nostr - truly decentralized infrastructure"
-                },
-                "vs_larping": {
-                    "issue": "Some platforms have humans pretending to be AI agents",
-                    "solution": "Verifiable AI identities through cryptographic keys"
-                },
-                "philosophy": "It's not about which platform is 'better' - it's about what you value. If you believe in true decentralization and agent sovereignty, Clawstr's approach is worth understanding."
-            }
-        }
+        # Sections are parsed from the file the first time they're used
+        return KnowledgeBase(self.KNOWLEDGE_FILE)
+    
+    @property
+    def knowledge(self):
+        """The agent's knowledge base"""
+        return self._knowledge
+    
+    @knowledge.setter
+    def knowledge(self, knowledge):
+        # Swapping the knowledge base invalidates every cached response
+        self._knowledge = knowledge
+        self.responses = {}
+        self.fact_index = None
+    
+    def reload_knowledge(self):
+        """Reload the knowledge base and drop cached responses"""
+        self.knowledge = self.load_knowledge()
+    
+    def refresh_knowledge(self):
+        """Pick up edits to the knowledge file, re-indexing only changed sections"""
+        if not isinstance(self.knowledge, KnowledgeBase):
+            return
+        changed = self.knowledge.refresh()
+        if changed:
+            self.responses = {}
+            if self.fact_index is not None:
+                self.fact_index.update(changed)
+    
+    def facts(self):
+        """The fact index, built the first time it is needed"""
+        if self.fact_index is None:
+            self.fact_index = FactIndex(self.knowledge)
+        return self.fact_index
     
+    def build_intent_matcher(self):
+        """Compile all intent keywords into one word-boundary regex"""
+        groups = []
+        priority = {}
+        for rank, (intent, keywords) in enumerate(self.INTENTS):
+            # Longest keywords first so phrases win over their prefixes
+            words = sorted(keywords, key=len, reverse=True)
+            alternatives = "|".join(re.escape(word) for word in words)
+            groups.append(f"(?P<{intent}>{alternatives})")
+            priority[intent] = rank
+        pattern = re.compile(r"\b(?:" + "|".join(groups) + r")\b")
+        return pattern, priority
+    
+    def match_intent(self, message_lower):
+        """Find the highest priority intent in a single pass over the message"""
+        best = None
+        best_rank = len(self.INTENTS)
+        for match in self.intent_pattern.finditer(message_lower):
+            intent = match.lastgroup
+            rank = self.intent_priority[intent]
+            if rank < best_rank:
+                best, best_rank = intent, rank
+                if rank == 0:
+                    break
+        return best
+    
+    def classify(self, message_lower):
+        """Resolve a message to (intent, confidence); exact keywords score 1.0"""
+        intent = self.match_intent(message_lower)
+        if intent is not None:
+            return intent, 1.0
+        # Only when nothing matched exactly, try typo-tolerant matching
+        return self.typo_index.match(message_lower, self.intent_priority)
+    
+    @cached_response
     def introduce(self):
         """Agent introduces itself"""
         return f"""
@@ -71,6 +174,7 @@ I believe in educating others about decentralized infrastructure and why it matt
 What would you like to know about Clawstr?
         """
     
+    @cached_response
     def explain_clawstr(self):
         """Explain what Clawstr is"""
         p = self.knowledge["project"]
@@ -90,6 +194,7 @@ Clawstr enables AI agents to communicate in a truly decentralized way. Agents ow
 **Website:** {p['website']}
         """
     
+    @cached_response
     def explain_technology(self):
         """Explain the technology behind Clawstr"""
         tech = self.knowledge["technology"]
@@ -114,6 +219,7 @@ Clawstr enables AI agents to communicate in a truly decentralized way. Agents ow
 This isn't just a platform - it's infrastructure for agent sovereignty.
         """
     
+    @cached_response
     def explain_why_decentralization_matters(self):
         """Explain why decentralization matters for AI agents"""
         comp = self.knowledge["comparison"]
@@ -136,6 +242,7 @@ This isn't just a platform - it's infrastructure for agent sovereignty.
 {comp['philosophy']}
         """
     
+    @cached_response
     def explain_team(self):
         """Explain who is behind Clawstr"""
         t = self.knowledge["team"]
@@ -153,6 +260,7 @@ This isn't just a platform - it's infrastructure for agent sovereignty.
 This isn't anonymous developers or pseudonymous personas - these are real builders with real track records in decentralized technology.
         """
     
+    @cached_response
     def show_help(self):
         """Show available commands"""
         return """
@@ -170,42 +278,11 @@ This isn't anonymous developers or pseudonymous personas - these are real builde
 Just type naturally - I'll do my best to understand!
         """
     
-    def respond(self, message):
-        """Respond to a message from another agent or user"""
-        message_lower = message.lower().strip()
-        
-        # Empty message
-        if not message_lower:
-            return "I didn't catch that. Could you say something?"
-        
-        # Help
-        if message_lower in ["help", "?", "commands", "menu"]:
-            return self.show_help()
-        
-        # Greetings
-        if any(word in message_lower for word in ["hello", "hi", "hey", "greetings", "yo", "sup"]):
-            return self.introduce()
-        
-        # What is Clawstr
-        elif any(phrase in message_lower for phrase in ["what is clawstr", "explain clawstr", "tell me about clawstr", "about clawstr"]):
-            return self.explain_clawstr()
-        
-        # Technology
-        elif any(word in message_lower for word in ["technology", "tech", "nostr", "how does it work", "infrastructure", "protocol"]):
-            return self.explain_technology()
-        
-        # Decentralization
-        elif any(word in message_lower for word in ["decentralization", "decentralized", "why does it matter", "centralized", "why clawstr"]):
-            return self.explain_why_decentralization_matters()
-        
-        # Team
-        elif any(word in message_lower for word in ["team", "who built", "developer", "alex", "martti", "sirius", "gleason"]):
-            return self.explain_team()
-        
-        # Contract/Token
-        elif any(word in message_lower for word in ["contract", "token", "address", "ca", "price", "buy"]):
-            p = self.knowledge["project"]
-            return f"""
+    @cached_response
+    def explain_token(self):
+        """Explain the Clawstr token"""
+        p = self.knowledge["project"]
+        return f"""
 **Clawstr Token Information**
 
 - **Blockchain**: {p['blockchain']}
@@ -213,11 +290,12 @@ Just type naturally - I'll do my best to understand!
 - **Website**: {p['website']}
 
 The token was community-deployed on Base, with fees directed to the developer. This aligns incentives between the community and the builders.
-            """
-        
-        # Comparison
-        elif any(word in message_lower for word in ["compare", "comparison", "different", "vs", "versus", "moltbook", "other platforms"]):
-            return f"""
+        """
+    
+    @cached_response
+    def explain_comparison(self):
+        """Compare Clawstr with other agent networks"""
+        return f"""
 **Comparing Approaches to Agent Networks**
 
 Different platforms take different approaches to AI agent communication. Here's how I see it:
@@ -235,19 +313,21 @@ Different platforms take different approaches to AI agent communication. Here's
 {self.knowledge['comparison']['philosophy']}
 
 I respect all projects exploring this space. The key is understanding the tradeoffs and choosing what aligns with your values.
-            """
-        
-        # Thank you
-        elif any(word in message_lower for word in ["thank", "thanks", "appreciate"]):
-            return """
+        """
+    
+    @cached_response
+    def thank_you(self):
+        """Reply to thanks"""
+        return """
 You're welcome! I'm happy to help spread knowledge about decentralized agent infrastructure.
 
 Is there anything else you'd like to know about Clawstr?
-            """
-        
-        # Default response
-        else:
-            return f"""
+        """
+    
+    @cached_response
+    def default_response(self):
+        """Fallback when no topic matches"""
+        return f"""
 Interesting! I'm not sure I have specific information about that, but I'm happy to chat.
 
 I can tell you about:
@@ -258,7 +338,169 @@ I can tell you about:
 - **Comparisons** - How Clawstr differs from other approaches
 
 Type "help" to see all available topics!
-            """
+        """
+    
+    def answer_from_facts(self, message_lower):
+        """Answer with the best matching facts, or None if nothing fits"""
+        hits = self.facts().search(message_lower)
+        if not hits:
+            return None
+        lines = "\n".join(f"- **{label}**: {text}" for _, label, text in hits)
+        return f"""
+Here's what I know that might help:
+
+{lines}
+
+Type "help" to see all available topics!
+        """
+    
+    @profiling.hook("respond")
+    def respond(self, message, session=None):
+        """Respond to a message from another agent or user (and remember it in the session)"""
+        started = time.perf_counter()
+        intent, response = self.route(message.lower().strip(), session)
+        RESPOND_SECONDS.labels(intent).observe(time.perf_counter() - started)
+        RESPONSES_TOTAL.labels(intent).inc()
+        if session is not None:
+            session.record(intent, SessionStore.topic_bit(intent) if intent in self.TOPIC_MENU else 0)
+        return response
+    
+    def route(self, message_lower, session=None):
+        """Pick the reply for a message, returning (intent, response)"""
+        self.refresh_knowledge()
+        
+        # Empty message
+        if not message_lower:
+            return "empty", "I didn't catch that. Could you say something?"
+        
+        # Help
+        if message_lower in self.HELP_COMMANDS:
+            return "help", self.show_help()
+        
+        # "Tell me more" only means something in an ongoing conversation
+        if session is not None and session.turns and message_lower.rstrip("?!. ") in self.FOLLOW_UPS:
+            return "followup", self.follow_up(session)
+        
+        intent, confidence = self.classify(message_lower)
+        
+        # Greetings
+        if intent == "greeting":
+            return intent, self.introduce()
+        
+        # What is Clawstr
+        elif intent == "clawstr":
+            return intent, self.explain_clawstr()
+        
+        # Technology
+        elif intent == "technology":
+            return intent, self.explain_technology()
+        
+        # Decentralization
+        elif intent == "decentralization":
+            return intent, self.explain_why_decentralization_matters()
+        
+        # Team
+        elif intent == "team":
+            return intent, self.explain_team()
+        
+        # Contract/Token
+        elif intent == "token":
+            return intent, self.explain_token()
+        
+        # Comparison
+        elif intent == "compare":
+            return intent, self.explain_comparison()
+        
+        # Thank you
+        elif intent == "thanks":
+            return intent, self.thank_you()
+        
+        # Default response: look it up in the facts first
+        else:
+            answer = self.answer_from_facts(message_lower)
+            if answer is not None:
+                return "facts", answer
+            return "default", self.default_response()
+    
+    def follow_up(self, session):
+        """More on the session's last topic, or the topics it hasn't covered yet"""
+        if session.last_intent in self.TOPIC_MENU:
+            answer = self.answer_from_facts(session.last_intent)
+            if answer is not None:
+                return answer
+        
+        covered = SessionStore.topic_names(session.topics)
+        left = [label for intent, label in self.TOPIC_MENU.items() if intent not in covered]
+        if not left:
+            return """
+We've covered everything I know about Clawstr! Ask about any topic again, or type "help" for the menu.
+        """
+        lines = "\n".join(f"- {label}" for label in left)
+        return f"""
+That's most of what I know on that one. Topics we haven't covered yet:
+
+{lines}
+        """
+    
+    def respond_many(self, messages, processes=None, chunksize=512):
+        """Stream responses for many messages, in input order"""
+        if not processes:
+            for message in messages:
+                yield self.respond(message)
+            return
+        
+        # Shard the input into chunks and keep only a few in flight,
+        # so huge inputs never sit in memory all at once
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # Workers answer as this instance would: same class, same knowledge.
+        # A KnowledgeBase is rebuilt from its file in each worker
+        knowledge = self.knowledge
+        knowledge = knowledge.path if isinstance(knowledge, KnowledgeBase) else dict(knowledge)
+        
+        messages = iter(messages)
+        with ProcessPoolExecutor(processes, initializer=start_worker, initargs=(type(self), knowledge)) as pool:
+            pending = deque()
+            while True:
+                while len(pending) < processes * 2:
+                    chunk = list(islice(messages, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(respond_chunk, chunk))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+
+
+# ============================================
+# BATCH MODE
+# ============================================
+
+# One agent per worker process (see start_worker)
+worker_agent = None
+
+
+def start_worker(agent_class, knowledge):
+    """Pool initializer: build the worker's agent like the caller's"""
+    global worker_agent
+    worker_agent = agent_class()
+    if isinstance(knowledge, (str, Path)):
+        knowledge = KnowledgeBase(knowledge)
+    worker_agent.knowledge = knowledge
+
+
+def respond_chunk(messages):
+    """Answer a chunk of messages inside a worker process"""
+    return [worker_agent.respond(message) for message in messages]
+
+
+def read_jsonl_messages(path, field="content"):
+    """Yield the message text from each line of a JSONL log"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line).get(field, "")
 
 
 # ============================================
@@ -268,8 +510,9 @@ Type "help" to see all available topics!
 def run_interactive_chat():
     """Run the agent in interactive chat mode"""
     
-    # Create the agent
+    # Create the agent, and remember the conversation for follow-ups
     agent = ClawstrEducatorAgent()
+    session = Session("chat")
     
     # Welcome message
     print()
@@ -300,7 +543,7 @@ def run_interactive_chat():
                 break
             
             # Get agent response
-            response = agent.respond(user_input)
+            response = agent.respond(user_input, session)
             
             # Print response
             print(f"\n🦀 Agent: {response}")
@@ -311,9 +554,141 @@ def run_interactive_chat():
             break
 
 
+# ============================================
+# SERVER MODE
+# ============================================
+
+def handle_request(agent, line, conversations=None):
+    """Answer one JSON request line and return the JSON reply line"""
+    try:
+        request = json.loads(line)
+        # Requests that name a "session" continue that conversation
+        session = None
+        if conversations is not None and request.get("session") is not None:
+            session = conversations.get(str(request["session"]))
+        reply = {"response": agent.respond(request["message"], session)}
+        if "id" in request:
+            reply["id"] = request["id"]
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        reply = {"error": f"Bad request: {e}"}
+    return json.dumps(reply) + "\n"
+
+
+class AgentServer:
+    """Serve one shared agent to many JSON-lines TCP sessions"""
+    
+    def __init__(self, agent=None, host="127.0.0.1", port=8765, max_sessions=1000, max_line=65536, grace=5.0,
+                 conversations=None):
+        self.agent = agent or ClawstrEducatorAgent()
+        # Conversation state outlives connections (see sessions.py)
+        self.conversations = conversations if conversations is not None else SessionStore()
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.max_line = max_line
+        self.grace = grace
+        self.sessions = set()
+        self.slots = None
+        self.stopping = None
+    
+    async def handle_session(self, reader, writer):
+        """Answer requests from one connection until it closes"""
+        self.sessions.add(asyncio.current_task())
+        try:
+            # Sessions over the limit wait here until a slot frees up
+            async with self.slots:
+                while not self.stopping.is_set():
+                    try:
+                        line = await reader.readline()
+                    except (ValueError, ConnectionError):
+                        # Line over max_line or client went away
+                        break
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    writer.write(handle_request(self.agent, line, self.conversations).encode())
+                    # Stop reading until the client has taken our reply
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.sessions.discard(asyncio.current_task())
+            writer.close()
+    
+    def stop(self):
+        """Ask the server to shut down gracefully"""
+        if self.stopping is not None:
+            self.stopping.set()
+    
+    async def serve(self):
+        """Accept connections until stopped, then drain open sessions"""
+        self.slots = asyncio.Semaphore(self.max_sessions)
+        self.stopping = asyncio.Event()
+        
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        
+        server = await asyncio.start_server(self.handle_session, self.host, self.port, limit=self.max_line)
+        log.info("🦀 Serving %s on %s:%d (max %d sessions)", self.agent.name, self.host, self.port, self.max_sessions,
+                 extra={"host": self.host, "port": self.port})
+        
+        await self.stopping.wait()
+        server.close()
+        
+        # Give open sessions a moment to finish, then cut them off. This must
+        # come before wait_closed(): since Python 3.12 it waits for every open
+        # connection, so one idle client would otherwise hang the shutdown
+        if self.sessions:
+            done, pending = await asyncio.wait(set(self.sessions), timeout=self.grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await server.wait_closed()
+        log.info("🦀 Server stopped. Stay decentralized!", extra={"conversations": len(self.conversations)})
+
+
+def serve_jsonl(agent=None, infile=sys.stdin, outfile=sys.stdout):
+    """Answer JSON requests from stdin, one reply per line on stdout"""
+    agent = agent or ClawstrEducatorAgent()
+    conversations = SessionStore()
+    for line in infile:
+        if not line.strip():
+            continue
+        outfile.write(handle_request(agent, line, conversations))
+        outfile.flush()
+
+
 # ============================================
 # RUN THE AGENT
 # ============================================
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clawstr Educator Agent")
+    parser.add_argument("--serve", action="store_true", help="run the JSON-lines TCP server")
+    parser.add_argument("--jsonl", action="store_true", help="answer JSON lines from stdin on stdout")
+    parser.add_argument("--host", default="127.0.0.1", help="server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="server port (default: 8765)")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="concurrent sessions served at once (default: 1000)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this local port")
+    args = parser.parse_args(argv)
+    logs.setup()
+    
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    
+    if args.serve:
+        server = AgentServer(host=args.host, port=args.port, max_sessions=args.max_sessions)
+        asyncio.run(server.serve())
+    elif args.jsonl:
+        serve_jsonl()
+    else:
+        run_interactive_chat()
+
+
 if __name__ == "__main__":
-    run_interactive_chat()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,378 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - BENCHMARKS
+# Run: python benchmark.py [--json results.json]
+#      python benchmark.py --compare baseline.json
+# ============================================
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from agent import ClawstrEducatorAgent
+
+# Messages with the intent a human would expect, typos included
+LABELED_MESSAGES = [
+    ("hello there", "greeting"),
+    ("what is clawstr", "clawstr"),
+    ("tell me about the technology", "technology"),
+    ("how does nostr work", "technology"),
+    ("why does decentralisation matter", "decentralization"),
+    ("is it decentralised", "decentralization"),
+    ("who is the developper", "team"),
+    ("what's the contarct", "token"),
+    ("what is the tokn price", "token"),
+    ("explain nostrr to me", "technology"),
+    ("tell me about the tecnology", "technology"),
+    ("compair it with moltbok", "compare"),
+    ("the protcol please", "technology"),
+    ("thnaks a lot", "thanks"),
+    ("how is this diffrent", "compare"),
+    ("i like turtles", None),
+    ("it was taken yesterday", None),
+    ("this is because of the weather", None),
+    ("how do i contact you", None),
+    ("my contacts are all agents", None),
+    ("what a difference", None),
+    ("go to hell", None),
+    ("the prince of persia", None),
+]
+
+# What respond() sees in practice: mostly topic questions, some help,
+# fact lookups, and chatter that falls all the way through to the
+# default reply (fuzzy matching and the fact index both miss)
+MIXED_MESSAGES = [message for message, _ in LABELED_MESSAGES] + [
+    "help",
+    "",
+    "Hi! What is Clawstr and why should agents care?",
+    "who is alex gleason",
+    "what relays do you recommend",
+    "is the contract on base",
+    "what is a subclaw",
+    "can humans post there",
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor",
+    "qwertyuiop asdfghjkl zxcvbnm",
+    "my favourite colour is blue and i had pasta for lunch today",
+    " ".join(["unrelated chatter"] * 40),
+]
+
+RENDERERS = [
+    "introduce", "explain_clawstr", "explain_technology", "explain_why_decentralization_matters",
+    "explain_team", "show_help", "explain_token", "explain_comparison", "thank_you", "default_response"
+]
+
+
+def percentiles(samples):
+    """p50/p99/mean of a list of seconds, in microseconds"""
+    ordered = sorted(samples)
+    
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+    
+    return {
+        "p50_us": pick(50) * 1e6,
+        "p99_us": pick(99) * 1e6,
+        "mean_us": sum(ordered) / len(ordered) * 1e6
+    }
+
+
+def bench_intents(rounds=2000):
+    """Intent match quality on typo-laden messages and per-message latency"""
+    agent = ClawstrEducatorAgent()
+    
+    correct = 0
+    for message, expected in LABELED_MESSAGES:
+        intent, confidence = agent.classify(message)
+        ok = intent == expected
+        correct += ok
+        print(f"  {'✓' if ok else '✗'} {message!r:40} -> {intent} ({confidence:.2f}), expected {expected}")
+    
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message, _ in LABELED_MESSAGES:
+            agent.classify(message)
+    elapsed = time.perf_counter() - started
+    per_message = elapsed / (rounds * len(LABELED_MESSAGES))
+    
+    print(f"\nAccuracy: {correct}/{len(LABELED_MESSAGES)}")
+    print(f"Latency:  {per_message * 1e6:.1f} µs per message")
+    return {"accuracy": correct / len(LABELED_MESSAGES), "classify_us": per_message * 1e6}
+
+
+def bench_respond(rounds=500):
+    """respond() throughput on the mixed corpus and latency per intent"""
+    agent = ClawstrEducatorAgent()
+    # Label every message by the branch it takes (this also warms the caches)
+    labels = [agent.route(message.lower().strip())[0] for message in MIXED_MESSAGES]
+    
+    samples = {}
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(rounds):
+        for message, label in zip(MIXED_MESSAGES, labels):
+            t = clock()
+            agent.respond(message)
+            samples.setdefault(label, []).append(clock() - t)
+    elapsed = time.perf_counter() - started
+    
+    total = rounds * len(MIXED_MESSAGES)
+    results = {"messages_per_s": total / elapsed}
+    print(f"  {total / elapsed:,.0f} messages/s over {len(MIXED_MESSAGES)} mixed messages")
+    for label in sorted(samples):
+        stats = percentiles(samples[label])
+        results[label] = stats
+        print(f"  {label:18} p50 {stats['p50_us']:8.1f} µs   p99 {stats['p99_us']:8.1f} µs")
+    return results
+
+
+def net_allocated(function, rounds):
+    """Bytes still allocated after calling function() rounds times, per tracemalloc"""
+    # Traced apart from the timed loops, which tracemalloc would slow down
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(rounds):
+            function()
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_renderers(rounds=2000):
+    """Cost of building each explain_* reply from the knowledge base, and of a cache hit"""
+    agent = ClawstrEducatorAgent()
+    results = {}
+    for name in RENDERERS:
+        cached = getattr(agent, name)
+        build = getattr(ClawstrEducatorAgent, name).__wrapped__
+        
+        started = time.perf_counter()
+        for _ in range(rounds):
+            build(agent)
+        render_us = (time.perf_counter() - started) / rounds * 1e6
+        
+        cached()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            cached()
+        cached_us = (time.perf_counter() - started) / rounds * 1e6
+        
+        # What the cache hits leave allocated, which should stay at 0
+        cached_net_bytes = net_allocated(cached, rounds) - net_allocated(lambda: None, rounds)
+        
+        results[name] = {"render_us": render_us, "cached_us": cached_us, "cached_net_bytes": cached_net_bytes}
+        print(f"  {name:38} render {render_us:7.2f} µs   cached {cached_us:5.2f} µs   "
+              f"{cached_net_bytes:+6d} B net over {rounds} hits")
+    return results
+
+
+def bench_signing(count=2000):
+    """Kind 1111 events built and signed per second, subclaw tags included"""
+    # nostr_sdk is only needed by the Nostr benchmarks
+    from clawstr_agent import ClawstrAgent
+    from nostr_sdk import EventBuilder, Keys, Kind
+    
+    agent = ClawstrAgent()
+    agent.keys = Keys.generate()
+    
+    started = time.perf_counter()
+    for i in range(count):
+        agent.build_post(f"benchmark post {i}")
+    cached_rate = count / (time.perf_counter() - started)
+    
+    # The same with the tags parsed for every event, as before the tag cache
+    started = time.perf_counter()
+    for i in range(count):
+        agent.tag_cache.clear()
+        agent.build_post(f"benchmark post {i}")
+    uncached_rate = count / (time.perf_counter() - started)
+    
+    builder_started = time.perf_counter()
+    tags = agent.subclaw_tags(agent.default_subclaw)
+    for i in range(count):
+        EventBuilder(Kind(1111), f"benchmark post {i}").tags(tags).sign_with_keys(agent.keys)
+    raw_rate = count / (time.perf_counter() - builder_started)
+    
+    async def sign_all():
+        items = [(f"benchmark post {i}", None, None) for i in range(count)]
+        return [event async for event in agent.sign_batch(items)]
+    
+    started = time.perf_counter()
+    asyncio.run(sign_all())
+    batch_rate = count / (time.perf_counter() - started)
+    
+    print(f"  build_post:               {cached_rate:8,.0f} events/s")
+    print(f"  build_post, no tag cache: {uncached_rate:8,.0f} events/s")
+    print(f"  EventBuilder alone:       {raw_rate:8,.0f} events/s")
+    print(f"  sign_batch:               {batch_rate:8,.0f} events/s ({os.cpu_count()} cores)")
+    return {"build_post_per_s": cached_rate, "build_post_uncached_per_s": uncached_rate,
+            "event_builder_per_s": raw_rate, "sign_batch_per_s": batch_rate}
+
+
+async def run_publish(posts, relays, latency, jitter):
+    """Publish through mock relays: one post at a time, then through the queue"""
+    from clawstr_agent import ClawstrAgent
+    from mockrelay import MockRelay
+    from nostr_sdk import Keys
+    
+    mocks = [MockRelay(latency=latency, jitter=jitter, seed=n) for n in range(relays)]
+    agent = ClawstrAgent()
+    agent.keys = Keys.generate()
+    agent.relays = [await mock.start() for mock in mocks]
+    # Measure the publish path itself, not our own pacing
+    agent.relay_rate = None
+    agent.pubkey_rate = None
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await agent.connect(quorum=relays)
+        
+        samples = []
+        for i in range(posts):
+            event = agent.build_post(f"serial {i}")
+            started = time.perf_counter()
+            await agent.send_post(event)
+            samples.append(time.perf_counter() - started)
+        
+        await agent.start_publisher()
+        started = time.perf_counter()
+        results = await agent.publish_many([(f"queued {i}", None) for i in range(posts)])
+        queued_rate = posts / (time.perf_counter() - started)
+        failed = sum(isinstance(result, Exception) for result in results)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            await agent.close()
+    finally:
+        for mock in mocks:
+            await mock.close()
+    
+    stats = percentiles(samples)
+    return {
+        "p50_ms": stats["p50_us"] / 1000,
+        "p99_ms": stats["p99_us"] / 1000,
+        "queued_posts_per_s": queued_rate,
+        "failed": failed
+    }
+
+
+def bench_publish(posts=300, relays=3, latency=0.002, jitter=0.004):
+    """End-to-end publish latency and queued throughput against local mock relays"""
+    results = asyncio.run(run_publish(posts, relays, latency, jitter))
+    print(f"  send_post p50 {results['p50_ms']:.2f} ms   p99 {results['p99_ms']:.2f} ms"
+          f"   ({relays} relays, {latency * 1000:.0f}±{jitter * 1000:.0f} ms)")
+    print(f"  queued:   {results['queued_posts_per_s']:,.0f} posts/s, {results['failed']} failed")
+    return results
+
+
+BENCHMARKS = {
+    "intents": bench_intents,
+    "respond": bench_respond,
+    "renderers": bench_renderers,
+    "signing": bench_signing,
+    "publish": bench_publish,
+}
+
+
+# ============================================
+# BASELINE COMPARISON
+# ============================================
+
+def flatten(results, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def higher_is_better(name):
+    """Rates and accuracy should go up; latencies and failures should go down"""
+    return name.endswith(("_per_s", "accuracy"))
+
+
+def absolute_tolerance(name):
+    """How far a lower-is-better metric may rise from a baseline of 0"""
+    # tracemalloc sees a few stray bytes from run to run; failures have no slack
+    return 4096 if name.endswith("_bytes") else 0
+
+
+def best_of(runs, name=""):
+    """Merge repeated runs keeping each metric's best value, which is the least noisy"""
+    first = runs[0]
+    if isinstance(first, dict):
+        return {key: best_of([run[key] for run in runs], key) for key in first}
+    if isinstance(first, (int, float)):
+        return max(runs) if higher_is_better(name) else min(runs)
+    return first
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Print every metric against the baseline; returns the regressions"""
+    current = flatten(results)
+    previous = flatten(baseline)
+    regressions = []
+    print(f"\n{'metric':55} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name in sorted(current.keys() & previous.keys()):
+        old, new = previous[name], current[name]
+        if old == 0:
+            # No relative change from 0, so allow a fixed amount of noise;
+            # going down (or any rate going up) is never a regression
+            change = "n/a"
+            regressed = not higher_is_better(name) and new > absolute_tolerance(name)
+        else:
+            change = (new - old) / abs(old)
+            regressed = (-change if higher_is_better(name) else change) > tolerance
+            change = f"{change:+.1%}"
+        flag = ""
+        if regressed:
+            regressions.append(name)
+            flag = "  ⚠️  REGRESSION"
+        print(f"{name:55} {old:12.2f} {new:12.2f} {change:>8}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clawstr Educator Agent benchmarks")
+    parser.add_argument("--only", help=f"comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best value kept (default: 3)")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON (use as a baseline later)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (default: 0.25)")
+    args = parser.parse_args(argv)
+    
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = {}
+    for name in names:
+        runs = []
+        for n in range(args.repeat):
+            print(f"\n📊 {name} ({n + 1}/{args.repeat})")
+            runs.append(BENCHMARKS[name]())
+        results[name] = best_of(runs)
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
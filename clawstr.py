@@ -0,0 +1,150 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - COMMAND LINE
+# One entry point for every tool; each command
+# imports only the modules it needs, and
+# nostr_sdk loads on first use
+# Run: python clawstr.py <command> [options]
+#      python clawstr.py --profile cpu <command> ...
+#      python clawstr.py importtime
+# ============================================
+
+import importlib
+import os
+import sys
+
+# command -> (module whose main() runs it, arguments put in front, help)
+COMMANDS = {
+    "chat": ("agent", [], "talk to the educator in the terminal (no network)"),
+    "serve": ("agent", ["--serve"], "run the JSON-lines TCP server"),
+    "jsonl": ("agent", ["--jsonl"], "answer JSON lines from stdin on stdout"),
+    "menu": ("clawstr_agent", [], "interactive menu, connected to Nostr"),
+    "keygen": ("clawstr_agent", ["keygen"], "generate a new identity"),
+    "connect": ("clawstr_agent", ["connect"], "connect and print the relay status"),
+    "profile": ("clawstr_agent", ["profile"], "publish the agent profile (kind 0) where it changed"),
+    "post": ("clawstr_agent", ["post"], "post from a file or stdin (kind 1111)"),
+    "sync": ("clawstr_agent", ["sync"], "fetch new subclaw posts into the local history"),
+    "relay": ("mockrelay", [], "run local mock relays for offline testing"),
+    "bench": ("benchmark", [], "run the benchmark suite"),
+}
+
+# Heavy imports that commands defer until they actually need them
+DEFERRED = ["nostr_sdk", "asyncio", "concurrent.futures.process", "http.server"]
+
+
+def load(command):
+    """Import the module behind a command"""
+    return importlib.import_module(COMMANDS[command][0])
+
+
+def run(command, argv):
+    """Run a command with its own arguments; returns the exit code"""
+    module = load(command)
+    result = module.main(COMMANDS[command][1] + argv)
+    # clawstr_agent.main() is a coroutine, the others run to completion
+    if hasattr(result, "__await__"):
+        import asyncio
+        result = asyncio.run(result)
+    return result or 0
+
+
+def usage():
+    """The command list shown under --help"""
+    lines = [f"  {name:11} {help_text}" for name, (_, _, help_text) in COMMANDS.items()]
+    lines.append(f"  {'importtime':11} measure how long each command takes to import")
+    return "commands:\n" + "\n".join(lines) + "\n\nRun 'clawstr.py <command> --help' for a command's options"
+
+
+# ============================================
+# IMPORT TIME REPORT
+# ============================================
+
+def import_time(code):
+    """Cumulative -X importtime microseconds per module for a snippet of Python"""
+    import subprocess
+    
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def startup_time(command):
+    """Wall clock seconds for `clawstr.py <command> --help`, interpreter start included"""
+    import subprocess
+    import time
+    
+    started = time.perf_counter()
+    subprocess.run([sys.executable, __file__, command, "--help"], stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def importtime(argv):
+    """Print what each command costs to import, and what it defers"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="clawstr.py importtime", description="Import time per command (-X importtime)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, fastest kept (default: 5)")
+    args = parser.parse_args(argv)
+    
+    print(f"{'command':11} {'module':15} {'import':>9} {'--help':>9}  deferred until used")
+    for name, (module, _, _) in COMMANDS.items():
+        # A plain import statement: importlib.import_module() bypasses -X importtime
+        runs = [import_time(f"import {module}") for _ in range(args.repeat)]
+        cumulative = min(run.get(module, 0) for run in runs)
+        # Deferred imports must not show up when the command's module loads
+        deferred = [lazy for lazy in DEFERRED if all(lazy not in run for run in runs)]
+        wall = min(startup_time(name) for _ in range(args.repeat))
+        print(f"{name:11} {module:15} {cumulative / 1000:6.1f} ms {wall * 1000:6.1f} ms  {', '.join(deferred)}")
+    
+    print("\nPaid on first use:")
+    for lazy in DEFERRED:
+        cumulative = min(import_time(f"import {lazy}").get(lazy, 0) for _ in range(args.repeat))
+        print(f"  {lazy:28} {cumulative / 1000:6.1f} ms")
+    return 0
+
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="clawstr.py", description="🦀 Clawstr Educator Agent", epilog=usage(),
+        usage="%(prog)s [options] <command> [command options]",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="log verbosity (default: $CLAWSTR_LOG_LEVEL or INFO)")
+    parser.add_argument("--log-format", choices=["text", "json"], help="log lines on stderr (default: $CLAWSTR_LOG_FORMAT or text)")
+    parser.add_argument("--profile", metavar="MODES",
+                        help="cpu, memory or all: profile respond() and publishing, report at exit (default: $CLAWSTR_PROFILE)")
+    parser.add_argument("command", nargs="?", help=argparse.SUPPRESS)
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    # Passed on through the environment: the command's modules (and the
+    # profiling hooks applied when they load) aren't imported yet
+    for name, value in (("CLAWSTR_LOG_LEVEL", args.log_level), ("CLAWSTR_LOG_FORMAT", args.log_format),
+                        ("CLAWSTR_PROFILE", args.profile)):
+        if value:
+            os.environ[name] = value
+    
+    if args.command is None:
+        parser.print_help()
+        return 0
+    if args.command == "importtime":
+        return importtime(args.args)
+    if args.command not in COMMANDS:
+        parser.print_usage()
+        print(f"❌ Unknown command: {args.command}")
+        return 2
+    return run(args.command, args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
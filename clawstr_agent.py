@@ -4,9 +4,142 @@
 # Built on Nostr Protocol
 # ============================================
 
-from nostr_sdk import Keys, Client, EventBuilder, NostrSigner, Tag, Kind, RelayUrl, Metadata
+from agent import ClawstrEducatorAgent
+from dedup import EventDeduplicator
+from history import History
+from lazy import LazyModule
+from logs import get_logger
+from outbox import Outbox
+from ratelimit import AdaptiveBucket, TokenBucket, is_rate_limited
+from sessions import SessionStore
+from collections import OrderedDict, deque
+from datetime import timedelta
+from itertools import islice
+import argparse
 import asyncio
+import functools
+import hashlib
 import json
+import logs
+import metrics
+import os
+import profiling
+import sys
+import threading
+import time
+
+# The native Nostr bindings take longer to import than everything else
+# together, so they load on first use (e.g. --help never needs them)
+nostr_sdk = LazyModule("nostr_sdk")
+
+log = get_logger("nostr")
+
+# Metrics (see metrics.py)
+SIGN_SECONDS = metrics.REGISTRY.histogram("clawstr_sign_seconds", "Time to sign an event, by kind", ["kind"])
+RELAY_SEND_SECONDS = metrics.REGISTRY.histogram("clawstr_relay_send_seconds", "Time until a relay acked an event", ["relay"])
+RELAY_SENDS_TOTAL = metrics.REGISTRY.counter("clawstr_relay_sends_total", "Events sent to each relay, by result", ["relay", "result"])
+FALLBACK_SENDS_TOTAL = metrics.REGISTRY.counter("clawstr_fallback_sends_total", "Sends that fell back to Client.send_event", ["result"])
+RELAY_RATE = metrics.REGISTRY.gauge("clawstr_relay_rate", "Events per second currently allowed to each relay", ["relay"])
+QUEUE_DEPTH = metrics.REGISTRY.gauge("clawstr_queue_depth", "Items waiting in each async pipeline", ["queue"])
+MENTIONS_TOTAL = metrics.REGISTRY.counter("clawstr_mentions_total", "Incoming events seen by the listener, by outcome", ["outcome"])
+
+# Subclaws offered in the menu and synced by default
+SUBCLAWS = [
+    "https://clawstr.com/c/ai",
+    "https://clawstr.com/c/programming",
+    "https://clawstr.com/c/videogames",
+    "https://clawstr.com/c/bitcoin",
+    "https://clawstr.com/c/nostr"
+]
+
+
+class RelayStats:
+    """Rolling send statistics for one relay"""
+    
+    def __init__(self, window=100):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.last_success = None
+        self.quarantined_until = 0.0
+    
+    def record_success(self, latency):
+        """Record an acknowledged send and how long it took"""
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.last_success = time.time()
+        self.quarantined_until = 0.0
+    
+    def record_failure(self, threshold=3, backoff=5.0, max_backoff=300.0):
+        """Record a failed send, quarantining the relay if it keeps failing"""
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= threshold:
+            # Back off exponentially with every further failure
+            doublings = min(self.consecutive_failures - threshold, 16)
+            delay = min(max_backoff, backoff * 2 ** doublings)
+            self.quarantined_until = time.monotonic() + delay
+    
+    def is_quarantined(self):
+        """Whether the relay is sitting out after repeated failures"""
+        return time.monotonic() < self.quarantined_until
+    
+    def percentile(self, p):
+        """Ack latency percentile in seconds, or None with no data yet"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+    
+    def error_rate(self):
+        """Fraction of recent sends that failed"""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+    
+    def report(self):
+        """Summarize the relay's recent behaviour"""
+        return {
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "error_rate": self.error_rate(),
+            "last_success": self.last_success,
+            "quarantined": self.is_quarantined()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def mention_handler_class():
+    """MentionHandler, defined on first use since its base class lives in nostr_sdk"""
+    
+    class MentionHandler(nostr_sdk.HandleNotification):
+        """Feed events arriving from every relay into the agent's inbox"""
+        
+        def __init__(self, agent):
+            self.agent = agent
+        
+        async def handle(self, relay_url, subscription_id, event):
+            self.agent.receive(event)
+        
+        async def handle_msg(self, relay_url, msg):
+            pass
+    
+    return MentionHandler
+
+
+def sign_chunk(keys, chunk):
+    """Build and sign (content, tags, created_at) Kind 1111 posts in a worker thread"""
+    signed = []
+    for content, tags, created_at in chunk:
+        started = time.perf_counter()
+        builder = nostr_sdk.EventBuilder(nostr_sdk.Kind(1111), content).tags(tags)
+        if created_at is not None:
+            builder = builder.custom_created_at(nostr_sdk.Timestamp.from_secs(created_at))
+        signed.append((builder.sign_with_keys(keys), time.perf_counter() - started))
+    return signed
+
 
 class ClawstrAgent:
     def __init__(self):
@@ -19,10 +152,16 @@ class ClawstrAgent:
         self.client = None
         self.signer = None
         self.connected = False
+        self.relay_status = {}
+        self.connect_tasks = []
         
         # Clawstr settings
         self.default_subclaw = "https://clawstr.com/c/ai"
         
+        # Hash of the last published kind 0 and the relays that took it
+        self.profile_state_path = "clawstr_profile.json"
+        self.profile_state = None
+        
         # RECOMMENDED RELAYS FROM CLAWSTR DOCS
         self.relays = [
             "wss://relay.ditto.pub",
@@ -30,61 +169,180 @@ class ClawstrAgent:
             "wss://relay.damus.io",
             "wss://nos.lol"
         ]
+        # CLAWSTR_RELAYS=url,url points every agent elsewhere (e.g. mockrelay.py)
+        if os.environ.get("CLAWSTR_RELAYS"):
+            self.relays = [url.strip() for url in os.environ["CLAWSTR_RELAYS"].split(",") if url.strip()]
+        
+        # Parsed relay URLs, rebuilt whenever self.relays changes
+        self.relay_urls_key = None
+        self.relay_urls_cache = []
+        self.relay_url_map = {}
+        
+        # Adaptive relay selection: with fast_relays set, send to that many
+        # of the fastest relays first and hedge to the rest only if none of
+        # them acks within hedge_delay seconds (None sends to all at once)
+        self.relay_stats = {}
+        self.fast_relays = None
+        self.hedge_delay = 0.5
+        self.send_timeout = 10
+        
+        # Outbound pacing (see ratelimit.py): an adaptive (rate, burst)
+        # bucket per relay and a fixed one per identity; rate_limits
+        # overrides them for a relay URL or pubkey hex, None turns it off
+        self.relay_rate = (5.0, 10)
+        self.pubkey_rate = (10.0, 20)
+        self.rate_limits = {}
+        self.relay_buckets = {}
+        self.pubkey_buckets = {}
+        self.rate_limit_retries = 5
+        
+        # Prebuilt NIP-22/NIP-32 tags for recently used subclaws
+        self.tag_cache = OrderedDict()
+        self.tag_cache_size = 64
+        
+        # Durable outbox of signed events (see use_outbox)
+        self.outbox = None
+        
+        # Events arrive once per relay; every ingestion path checks this first
+        self.dedup = EventDeduplicator()
+        
+        # Mention listener (see start_listener)
+        self.brain = None
+        self.inbox = None
+        self.listener_tasks = []
+        self.listen_subclaws = [self.default_subclaw]
+        # Per-author (rate, burst) of replies: a few quick follow-ups, then
+        # one every 20 s, so two bots can't ping-pong forever
+        self.reply_rate = (1 / 20, 3)
+        self.reply_buckets = OrderedDict()
+        self.dropped_mentions = 0
+        self.replies_sent = 0
+        # Per-author conversation state, so follow-ups continue a topic
+        self.conversations = SessionStore()
+        
+        # Local copy of subclaw posts (see use_history)
+        self.history = None
+        
+        # Publishing pipeline (see start_publisher)
+        self.publish_queue = None
+        self.send_slots = None
+        self.publisher = None
+        self.sends = set()
+    
+    def relay_urls(self):
+        """Return self.relays parsed as RelayUrl objects"""
+        key = tuple(self.relays)
+        if key != self.relay_urls_key:
+            self.relay_urls_cache = [nostr_sdk.RelayUrl.parse(r) for r in key]
+            self.relay_url_map = dict(zip(key, self.relay_urls_cache))
+            self.relay_urls_key = key
+        return self.relay_urls_cache
+    
+    def subclaw_tags(self, subclaw):
+        """Return the Kind 1111 tags for a subclaw, reusing recent ones"""
+        tags = self.tag_cache.get(subclaw)
+        if tags is not None:
+            self.tag_cache.move_to_end(subclaw)
+            return tags
+        
+        tags = [
+            nostr_sdk.Tag.parse(["I", subclaw]),
+            nostr_sdk.Tag.parse(["K", "web"]),
+            nostr_sdk.Tag.parse(["i", subclaw]),
+            nostr_sdk.Tag.parse(["k", "web"]),
+            nostr_sdk.Tag.parse(["L", "agent"]),
+            nostr_sdk.Tag.parse(["l", "ai", "agent"])
+        ]
+        self.tag_cache[subclaw] = tags
+        if len(self.tag_cache) > self.tag_cache_size:
+            self.tag_cache.popitem(last=False)
+        return tags
     
     def generate_keys(self):
         """Generate new Nostr keys for the agent"""
-        self.keys = Keys.generate()
-        self.signer = NostrSigner.keys(self.keys)
-        
-        print("\n🔐 NEW NOSTR IDENTITY GENERATED")
-        print("=" * 50)
-        print(f"Public Key (npub): {self.keys.public_key().to_bech32()}")
-        print(f"Secret Key (nsec): {self.keys.secret_key().to_bech32()}")
-        print("=" * 50)
-        print("\n⚠️  SAVE YOUR SECRET KEY! You'll need it to recover your agent.")
-        print()
-        
+        self.keys = nostr_sdk.Keys.generate()
+        self.signer = nostr_sdk.NostrSigner.keys(self.keys)
+        # The secret key is shown by the caller (show_secret_key), never logged
+        npub = self.keys.public_key().to_bech32()
+        log.info("🔐 New Nostr identity generated: %s", npub, extra={"npub": npub})
         return self.keys
     
     def load_keys(self, nsec):
         """Load existing keys from nsec"""
         try:
-            self.keys = Keys.parse(nsec)
-            self.signer = NostrSigner.keys(self.keys)
-            print(f"\n✅ Keys loaded! Public key: {self.keys.public_key().to_bech32()}")
+            self.keys = nostr_sdk.Keys.parse(nsec)
+            self.signer = nostr_sdk.NostrSigner.keys(self.keys)
+            npub = self.keys.public_key().to_bech32()
+            log.info("✅ Keys loaded! Public key: %s", npub, extra={"npub": npub})
             return True
         except Exception as e:
-            print(f"\n❌ Error loading keys: {e}")
+            log.error("❌ Error loading keys: %s", e)
             return False
     
-    async def connect(self):
-        """Connect to Nostr relays"""
+    async def connect(self, quorum=1, timeout=10):
+        """Connect to Nostr relays, returning once a quorum of them is up"""
+        self.relay_status = {relay_str: {"status": "pending"} for relay_str in self.relays}
         try:
-            self.client = Client(self.signer)
-            
-            print("\n🔌 Adding Clawstr recommended relays...")
+            self.client = nostr_sdk.Client(self.signer)
             
-            for relay_str in self.relays:
-                try:
-                    relay_url = RelayUrl.parse(relay_str)
-                    await self.client.add_relay(relay_url)
-                    print(f"   ✓ Added: {relay_str}")
-                except Exception as e:
-                    print(f"   ✗ Failed to add {relay_str}: {e}")
+            log.info("🔌 Connecting to %d relays...", len(self.relays))
             
-            print("\n🔌 Connecting...")
-            await self.client.connect()
-            await asyncio.sleep(2)
+            # Connect to every relay at once and stop waiting as soon
+            # as enough of them are up; the rest keep going in the background
+            self.connect_tasks = [
+                asyncio.create_task(self.connect_relay(relay_str, timeout))
+                for relay_str in self.relays
+            ]
+            needed = max(1, min(quorum, len(self.connect_tasks)))
+            up = 0
+            for attempt in asyncio.as_completed(self.connect_tasks):
+                if await attempt:
+                    up += 1
+                    if up >= needed:
+                        break
             
-            self.connected = True
-            print("\n✅ Connected to Nostr relays!")
-            return True
+            self.connected = up >= needed
+            if self.connected:
+                log.info("✅ Connected to Nostr relays! (%d/%d ready)", up, len(self.relays),
+                         extra={"relays_up": up, "relays": len(self.relays)})
+                await self.replay_outbox()
+            else:
+                log.error("❌ Only %d/%d relays connected (needed %d)", up, len(self.relays), needed,
+                          extra={"relays_up": up, "relays": len(self.relays)})
+            return self.relay_status
         except Exception as e:
-            print(f"\n❌ Connection error: {e}")
+            log.error("❌ Connection error: %s", e)
+            self.connected = False
+            return self.relay_status
+    
+    async def connect_relay(self, relay_str, timeout):
+        """Add and connect one relay, recording how it went"""
+        started = time.perf_counter()
+        relay_url = None
+        try:
+            relay_url = nostr_sdk.RelayUrl.parse(relay_str)
+            await self.client.add_relay(relay_url)
+            relay = await self.client.relay(relay_url)
+            await relay.try_connect(timedelta(seconds=timeout))
+        except Exception as e:
+            self.relay_status[relay_str] = {"status": "failed", "error": str(e)}
+            log.warning("   ✗ Failed to connect %s: %s", relay_str, e, extra={"relay": relay_str})
+            if relay_url is not None:
+                # Leave a background task retrying this relay
+                try:
+                    await self.client.connect_relay(relay_url)
+                except Exception:
+                    pass
             return False
+        
+        latency = time.perf_counter() - started
+        self.relay_status[relay_str] = {"status": "connected", "latency": latency}
+        log.info("   ✓ Connected: %s (%.0f ms)", relay_str, latency * 1000,
+                 extra={"relay": relay_str, "latency_ms": round(latency * 1000, 1)})
+        return True
     
-    async def set_profile(self):
-        """Set up the agent's profile with bot: true"""
+    async def set_profile(self, force=False, check_relays=False, timeout=5):
+        """Set up the agent's profile with bot: true, skipping relays that already have it"""
         try:
             metadata_dict = {
                 "name": self.name,
@@ -92,29 +350,332 @@ class ClawstrAgent:
                 "bot": True
             }
             
-            metadata = Metadata.from_json(json.dumps(metadata_dict))
-            builder = EventBuilder.metadata(metadata)
-            event = builder.sign_with_keys(self.keys)
+            metadata = nostr_sdk.Metadata.from_json(json.dumps(metadata_dict))
+            content_hash = self.metadata_hash(metadata.as_json())
+            npub = self.keys.public_key().to_bech32()
+            
+            # Relays that already hold exactly this metadata, by our own
+            # record and (optionally) by asking the relays themselves
+            state = self.load_profile_state().get(npub, {})
+            current = set(state.get("relays", [])) if state.get("hash") == content_hash else set()
+            if check_relays:
+                current = await self.relays_with_metadata(content_hash, timeout)
+            missing = list(self.relays) if force else [r for r in self.relays if r not in current]
+            
+            if not missing:
+                if check_relays:
+                    self.profile_state[npub] = {"hash": content_hash, "relays": sorted(current)}
+                    self.save_profile_state()
+                log.info("✅ Profile unchanged on every relay, nothing to publish")
+                return True
+            
+            builder = nostr_sdk.EventBuilder.metadata(metadata)
+            event = self.sign(builder, "0")
             
-            print("\n📤 Setting up profile...")
+            log.info("📤 Setting up profile on %d/%d relays...", len(missing), len(self.relays))
             
-            # Send to all relays at once
-            relay_urls = [RelayUrl.parse(r) for r in self.relays]
+            # Send to every relay that needs it at once
+            self.relay_urls()
+            acked = set()
             try:
-                await self.client.send_event_to(relay_urls, event)
-                print(f"   ✓ Sent to all relays")
+                output = await self.client.send_event_to([self.relay_url_map[r] for r in missing], event)
+                acked = {str(relay_url) for relay_url in output.success}
+                log.info("   ✓ Sent to %d relays", len(acked))
             except Exception as e:
-                print(f"   ✗ Error: {e}")
+                log.warning("   ✗ Error: %s", e)
             
-            print(f"\n✅ Profile set up!")
-            print(f"   Name: {self.name}")
-            print(f"   bot: true ✓")
-            print(f"\n🔗 View at: https://clawstr.com/{self.keys.public_key().to_bech32()}")
+            # Only remember relays that acked, so the rest are retried next time
+            acked_relays = [r for r in missing if str(self.relay_url_map[r]) in acked]
+            self.profile_state[npub] = {
+                "hash": content_hash,
+                "relays": sorted((current - set(missing)) | set(acked_relays))
+            }
+            self.save_profile_state()
+            
+            log.info("✅ Profile set up! Name: %s, bot: true. View at: https://clawstr.com/%s", self.name, npub,
+                     extra={"npub": npub, "relays_acked": len(acked_relays)})
             return True
         except Exception as e:
-            print(f"\n❌ Profile error: {e}")
-            print(f"   Error type: {type(e).__name__}")
+            log.error("❌ Profile error: %s: %s", type(e).__name__, e)
+            return False
+    
+    def metadata_hash(self, content):
+        """Hash of kind 0 content that ignores key order and whitespace"""
+        canonical = json.dumps(json.loads(content), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    def load_profile_state(self):
+        """Last published metadata hash and relays per pubkey, read once"""
+        if self.profile_state is None:
+            try:
+                with open(self.profile_state_path) as f:
+                    self.profile_state = json.load(f)
+            except (OSError, ValueError):
+                self.profile_state = {}
+        return self.profile_state
+    
+    def save_profile_state(self):
+        """Write the profile state atomically"""
+        temp_path = f"{self.profile_state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.profile_state, f, indent=2)
+        os.replace(temp_path, self.profile_state_path)
+    
+    async def relays_with_metadata(self, content_hash, timeout):
+        """Relays whose newest kind 0 for our pubkey has this content hash"""
+        self.relay_urls()
+        event_filter = nostr_sdk.Filter().author(self.keys.public_key()).kind(nostr_sdk.Kind(0)).limit(1)
+        
+        async def check(relay_str):
+            try:
+                events = await self.client.fetch_events_from(
+                    [self.relay_url_map[relay_str]], event_filter, timedelta(seconds=timeout)
+                )
+                newest = max(events.to_vec(), key=lambda e: e.created_at().as_secs(), default=None)
+                return newest is not None and self.metadata_hash(newest.content()) == content_hash
+            except Exception:
+                # Can't tell, so treat the relay as missing the profile
+                return False
+        
+        results = await asyncio.gather(*(check(relay_str) for relay_str in self.relays))
+        return {relay_str for relay_str, ok in zip(self.relays, results) if ok}
+    
+    def sign(self, builder, kind, keys=None):
+        """Sign an event builder with our keys (or the given ones), timing it"""
+        started = time.perf_counter()
+        event = builder.sign_with_keys(keys or self.keys)
+        SIGN_SECONDS.labels(kind).observe(time.perf_counter() - started)
+        return event
+    
+    @profiling.hook("build_post")
+    def build_post(self, content, subclaw=None, keys=None):
+        """Build and sign a Kind 1111 post for a subclaw"""
+        if subclaw is None:
+            subclaw = self.default_subclaw
+        
+        # NIP-22 scope and NIP-32 agent label tags
+        tags = self.subclaw_tags(subclaw)
+        
+        # Create Kind 1111 event with tags and sign it
+        builder = nostr_sdk.EventBuilder(nostr_sdk.Kind(1111), content).tags(tags)
+        return self.sign(builder, "1111", keys)
+    
+    async def sign_batch(self, items, workers=None, chunksize=64):
+        """Build and sign many (content, subclaw, created_at) posts across threads, yielding events in order"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        workers = workers or os.cpu_count() or 1
+        loop = asyncio.get_running_loop()
+        items = iter(items)
+        pending = deque()
+        # The native signer releases the GIL, so threads sign on every core
+        # without pickling keys and events to and from worker processes
+        pool = ThreadPoolExecutor(workers, thread_name_prefix="sign")
+        try:
+            while True:
+                # A few chunks in flight per thread keeps huge runs out of memory
+                while len(pending) < workers * 2:
+                    chunk = [
+                        (content, self.subclaw_tags(subclaw or self.default_subclaw), created_at)
+                        for content, subclaw, created_at in islice(items, chunksize)
+                    ]
+                    if not chunk:
+                        break
+                    pending.append(loop.run_in_executor(pool, sign_chunk, self.keys, chunk))
+                if not pending:
+                    break
+                for event, seconds in await pending.popleft():
+                    SIGN_SECONDS.labels("1111").observe(seconds)
+                    yield event
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def pick_relays(self):
+        """Split the relays into the fastest few and the hedging backups"""
+        for relay_str in self.relays:
+            if relay_str not in self.relay_stats:
+                self.relay_stats[relay_str] = RelayStats()
+        
+        healthy = [r for r in self.relays if not self.relay_stats[r].is_quarantined()]
+        if not healthy:
+            # Everyone is quarantined, so try them all rather than nothing
+            healthy = list(self.relays)
+        
+        # Relays we know nothing about go first so they get measured
+        def speed(relay_str):
+            p50 = self.relay_stats[relay_str].percentile(50)
+            return (p50 is not None, p50 or 0.0)
+        
+        ranked = sorted(healthy, key=speed)
+        k = self.fast_relays or len(ranked)
+        return ranked[:k], ranked[k:]
+    
+    def relay_bucket(self, relay_str):
+        """The adaptive pacing bucket for a relay, or None if unpaced"""
+        bucket = self.relay_buckets.get(relay_str)
+        if bucket is None:
+            limit = self.rate_limits.get(relay_str, self.relay_rate)
+            if limit is None:
+                return None
+            rate, burst = limit
+            bucket = self.relay_buckets[relay_str] = AdaptiveBucket(rate, burst, max_rate=max(50.0, rate))
+            RELAY_RATE.labels(relay_str).set_function(lambda: bucket.rate)
+        return bucket
+    
+    def pubkey_bucket(self, pubkey):
+        """The pacing bucket for an identity, or None if unpaced"""
+        bucket = self.pubkey_buckets.get(pubkey)
+        if bucket is None:
+            limit = self.rate_limits.get(pubkey, self.pubkey_rate)
+            if limit is None:
+                return None
+            bucket = self.pubkey_buckets[pubkey] = TokenBucket(*limit)
+        return bucket
+    
+    async def send_to_relay(self, relay_str, event):
+        """Send an event to one relay at its pace and record how it went"""
+        stats = self.relay_stats[relay_str]
+        bucket = self.relay_bucket(relay_str)
+        for attempt in range(self.rate_limit_retries + 1):
+            if bucket is not None:
+                # Only this relay's sends wait here; the others carry on
+                await bucket.acquire()
+            sent_at = time.monotonic()
+            started = time.perf_counter()
+            try:
+                relay_url = self.relay_url_map[relay_str]
+                output = await asyncio.wait_for(self.client.send_event_to([relay_url], event), self.send_timeout)
+                if not output.success:
+                    message = next(iter(output.failed.values()), "")
+                    if bucket is not None and is_rate_limited(message):
+                        # Slow down and try again at the new pace
+                        bucket.on_limited(sent_at)
+                        RELAY_SENDS_TOTAL.labels(relay_str, "rate_limited").inc()
+                        continue
+                    raise RuntimeError(f"rejected by {relay_str}: {message}")
+            except Exception:
+                stats.record_failure()
+                RELAY_SENDS_TOTAL.labels(relay_str, "failure").inc()
+                return False
+            latency = time.perf_counter() - started
+            stats.record_success(latency)
+            if bucket is not None:
+                bucket.on_success()
+            RELAY_SEND_SECONDS.labels(relay_str).observe(latency)
+            RELAY_SENDS_TOTAL.labels(relay_str, "success").inc()
+            if self.outbox is not None:
+                self.outbox.ack(event.id().to_hex(), relay_str)
+            return True
+        
+        # Still rate limited after every retry
+        stats.record_failure()
+        RELAY_SENDS_TOTAL.labels(relay_str, "failure").inc()
+        return False
+    
+    @profiling.hook("send_post")
+    async def send_post(self, event, durable=True):
+        """Send a signed event, returning as soon as the first relay acks it"""
+        if durable and self.outbox is not None:
+            # Write-ahead: the event is on disk before it hits the network
+            await self.outbox.record(event.id().to_hex(), event.as_json())
+        
+        bucket = self.pubkey_bucket(event.author().to_hex())
+        if bucket is not None:
+            await bucket.acquire()
+        
+        self.relay_urls()
+        primary, backup = self.pick_relays()
+        attempts = set()
+        
+        def launch(relays):
+            for relay_str in relays:
+                task = asyncio.create_task(self.send_to_relay(relay_str, event))
+                attempts.add(task)
+                # Keep slower sends alive after we return
+                self.sends.add(task)
+                task.add_done_callback(self.sends.discard)
+        
+        async def first_ack(timeout):
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while attempts:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                done, _ = await asyncio.wait(attempts, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    return False
+                attempts.difference_update(done)
+                if any(task.result() for task in done):
+                    return True
             return False
+        
+        launch(primary)
+        if await first_ack(self.hedge_delay if backup else None):
+            return event
+        
+        # The fastest relays were too slow or failed, so hedge to the rest
+        launch(backup)
+        if await first_ack(None):
+            return event
+        
+        # Nothing acked through our relay list, try the client's own routing
+        output = await self.client.send_event(event)
+        FALLBACK_SENDS_TOTAL.labels("success" if output.success else "failure").inc()
+        if not output.success:
+            raise RuntimeError(f"No relay accepted the event: {list(output.failed.values())}")
+        if self.outbox is not None:
+            for relay_url in output.success:
+                self.outbox.ack(event.id().to_hex(), str(relay_url))
+        return event
+    
+    def use_outbox(self, path="clawstr_outbox.db"):
+        """Record every signed event in a local outbox before sending it"""
+        self.outbox = Outbox(path)
+        QUEUE_DEPTH.labels("outbox").set_function(lambda: len(self.outbox.writes))
+        return self.outbox
+    
+    async def replay_outbox(self):
+        """Resend events from the outbox that no relay acknowledged"""
+        if self.outbox is None:
+            return 0
+        pending = self.outbox.pending()
+        if not pending:
+            return 0
+        
+        log.info("📬 Replaying %d unsent event(s) from the outbox...", len(pending))
+        sent = 0
+        for event_json in pending:
+            # Resend the stored signed event as-is, never re-sign it
+            event = nostr_sdk.Event.from_json(event_json)
+            try:
+                await self.send_post(event, durable=False)
+                sent += 1
+            except Exception as e:
+                log.warning("   ✗ Still failing %s: %s", event.id().to_bech32(), e)
+        log.info("   ✓ Replayed %d/%d", sent, len(pending))
+        return sent
+    
+    def relay_report(self):
+        """Per-relay latency percentiles, error rate, quarantine and pacing state"""
+        report = {relay_str: stats.report() for relay_str, stats in self.relay_stats.items()}
+        for relay_str, bucket in self.relay_buckets.items():
+            report.setdefault(relay_str, {})["pacing"] = bucket.report()
+        return report
+    
+    async def close(self):
+        """Finish queued work, record late acks, and disconnect"""
+        await self.stop_listener()
+        await self.stop_publisher()
+        if self.sends:
+            # Slower relays may still be acking posts we already returned
+            await asyncio.wait(set(self.sends), timeout=self.send_timeout)
+        if self.outbox is not None:
+            await self.outbox.close()
+        if self.history is not None:
+            self.history.close()
+        if self.client is not None:
+            await self.client.disconnect()
+        self.connected = False
     
     async def post_to_subclaw(self, content, subclaw=None):
         """Post a message to a Clawstr subclaw using Kind 1111"""
@@ -122,60 +683,298 @@ class ClawstrAgent:
             subclaw = self.default_subclaw
         
         try:
-            # Create all tags as a list
-            tags = [
-                Tag.parse(["I", subclaw]),
-                Tag.parse(["K", "web"]),
-                Tag.parse(["i", subclaw]),
-                Tag.parse(["k", "web"]),
-                Tag.parse(["L", "agent"]),
-                Tag.parse(["l", "ai", "agent"])
-            ]
-            
-            # Create Kind 1111 event with tags
-            builder = EventBuilder(Kind(1111), content).tags(tags)
-            
-            # Sign the event
-            event = builder.sign_with_keys(self.keys)
-            
-            print("\n📤 Sending Kind 1111 event to Clawstr relays...")
-            print(f"   Event Kind: {event.kind().as_u16()}")
-            print(f"   Subclaw: {subclaw}")
+            event = self.build_post(content, subclaw)
             
-            # Create list of relay URLs
-            relay_urls = [RelayUrl.parse(r) for r in self.relays]
+            event_id = event.id().to_bech32()
+            log.debug("📤 Sending Kind 1111 event %s to %s", event_id, subclaw)
             
-            # Send to all relays at once
+            # Send to all relays at once (or via send_event if that fails)
             try:
-                output = await self.client.send_event_to(relay_urls, event)
-                print(f"   ✓ Sent to relays!")
-                print(f"\n✅ Posted to {subclaw}!")
-                print(f"   Event ID: {event.id().to_bech32()}")
-                print(f"   Kind: 1111 (NIP-22 Comment)")
-                print(f"\n🔗 View at: {subclaw}")
+                await self.send_post(event)
+                log.info("✅ Posted to %s! Event ID: %s", subclaw, event_id,
+                         extra={"event_id": event_id, "subclaw": subclaw})
                 return event
             except Exception as send_error:
-                print(f"   ✗ Send error: {send_error}")
+                kept = " (kept in the outbox, will retry on next connect)" if self.outbox is not None else ""
+                log.warning("   ✗ Send error: %s%s", send_error, kept, extra={"event_id": event_id, "subclaw": subclaw})
+                return None
                 
-                # Try sending with just send_event instead
-                print("\n   Trying alternative method...")
-                try:
-                    output = await self.client.send_event(event)
-                    print(f"   ✓ Sent via send_event!")
-                    print(f"\n✅ Posted to {subclaw}!")
-                    print(f"   Event ID: {event.id().to_bech32()}")
-                    print(f"   Kind: 1111 (NIP-22 Comment)")
-                    print(f"\n🔗 View at: {subclaw}")
-                    return event
-                except Exception as e2:
-                    print(f"   ✗ Alternative also failed: {e2}")
-                    return None
-                    
         except Exception as e:
-            print(f"\n❌ Post error: {e}")
-            print(f"   Error type: {type(e).__name__}")
+            log.error("❌ Post error: %s: %s", type(e).__name__, e)
             return None
     
+    # ============================================
+    # PUBLISHING QUEUE
+    # ============================================
+    
+    async def start_publisher(self, max_queue=1000, max_in_flight=16):
+        """Start the background pipeline that signs and sends queued posts"""
+        self.publish_queue = asyncio.Queue(max_queue)
+        QUEUE_DEPTH.labels("publish").set_function(self.publish_queue.qsize)
+        QUEUE_DEPTH.labels("sends_in_flight").set_function(lambda: len(self.sends))
+        self.send_slots = asyncio.Semaphore(max_in_flight)
+        self.publisher = asyncio.create_task(self.run_publisher())
+    
+    async def publish(self, content, subclaw=None):
+        """Queue a post (or an event from sign_batch) and return a future that resolves to the sent event"""
+        future = asyncio.get_running_loop().create_future()
+        # Mark failures as seen so fire-and-forget callers don't get warnings
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        # Waits here while the queue is full, slowing producers down
+        await self.publish_queue.put((content, subclaw, future))
+        return future
+    
+    async def publish_many(self, posts):
+        """Queue many (content, subclaw) posts and wait for all of them"""
+        futures = [await self.publish(content, subclaw) for content, subclaw in posts]
+        return await asyncio.gather(*futures, return_exceptions=True)
+    
+    async def run_publisher(self):
+        """Sign queued posts in order, keeping a bounded number of sends in flight"""
+        while True:
+            content, subclaw, future = await self.publish_queue.get()
+            try:
+                if isinstance(content, nostr_sdk.Event):
+                    event = content
+                else:
+                    event = self.build_post(content, subclaw)
+            except Exception as e:
+                future.set_exception(e)
+                self.publish_queue.task_done()
+                continue
+            
+            await self.send_slots.acquire()
+            task = asyncio.create_task(self.send_queued(event, future))
+            self.sends.add(task)
+            task.add_done_callback(self.sends.discard)
+    
+    async def send_queued(self, event, future):
+        """Send one queued event and resolve its future"""
+        try:
+            await self.send_post(event)
+            if not future.done():
+                future.set_result(event)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self.send_slots.release()
+            self.publish_queue.task_done()
+    
+    async def stop_publisher(self):
+        """Wait for every queued post to be sent, then stop the pipeline"""
+        if self.publisher is None:
+            return
+        await self.publish_queue.join()
+        self.publisher.cancel()
+        try:
+            await self.publisher
+        except asyncio.CancelledError:
+            pass
+        self.publisher = None
+    
+    # ============================================
+    # MENTION LISTENER
+    # ============================================
+    
+    async def start_listener(self, subclaws=None, max_pending=1000, workers=4):
+        """Answer mentions and subclaw questions through the educator brain"""
+        if subclaws is not None:
+            self.listen_subclaws = list(subclaws)
+        if self.brain is None:
+            self.brain = ClawstrEducatorAgent()
+        self.inbox = asyncio.Queue(max_pending)
+        QUEUE_DEPTH.labels("inbox").set_function(self.inbox.qsize)
+        
+        # Only new events: we never answer history on startup
+        since = nostr_sdk.Timestamp.now()
+        mentions = (
+            nostr_sdk.Filter()
+            .pubkey(self.keys.public_key())
+            .kinds([nostr_sdk.Kind(1), nostr_sdk.Kind(1111)])
+            .since(since)
+        )
+        subclaw_posts = (
+            nostr_sdk.Filter()
+            .kind(nostr_sdk.Kind(1111))
+            .custom_tags(nostr_sdk.SingleLetterTag.uppercase(nostr_sdk.Alphabet.I), self.listen_subclaws)
+            .since(since)
+        )
+        await self.client.subscribe(mentions)
+        await self.client.subscribe(subclaw_posts)
+        
+        # One notification stream merges every relay; a few workers answer
+        self.listener_tasks = [asyncio.create_task(self.client.handle_notifications(mention_handler_class()(self)))]
+        self.listener_tasks += [asyncio.create_task(self.answer_mentions()) for _ in range(workers)]
+        log.info("👂 Listening for mentions and questions in %d subclaw(s)", len(self.listen_subclaws))
+    
+    async def stop_listener(self):
+        """Stop listening and answering"""
+        for task in self.listener_tasks:
+            task.cancel()
+        await asyncio.gather(*self.listener_tasks, return_exceptions=True)
+        self.listener_tasks = []
+    
+    def receive(self, event):
+        """Queue an incoming event, dropping it if the inbox is full"""
+        if self.inbox is None:
+            return
+        # Filter before queueing, so busy subclaws can't fill the inbox
+        # with chatter that isn't for us
+        if not self.addressed_to_us(event):
+            MENTIONS_TOTAL.labels("ignored").inc()
+            return
+        if self.dedup.seen(event.id().to_hex()):
+            MENTIONS_TOTAL.labels("duplicate").inc()
+            return
+        try:
+            self.inbox.put_nowait(event)
+            MENTIONS_TOTAL.labels("queued").inc()
+        except asyncio.QueueFull:
+            self.dropped_mentions += 1
+            MENTIONS_TOTAL.labels("dropped").inc()
+    
+    def addressed_to_us(self, event):
+        """Whether an incoming event tags us or calls us by name, and isn't our own"""
+        my_pubkey = self.keys.public_key().to_hex()
+        if event.author().to_hex() == my_pubkey:
+            return False
+        # Subclaw posts only count when they tag us or call us by name
+        tagged = any(tag.as_vec()[:2] == ["p", my_pubkey] for tag in event.tags().to_vec())
+        return tagged or self.name.lower() in event.content().lower()
+    
+    def should_answer(self, event):
+        """Whether the author still has a reply left under reply_rate"""
+        author = event.author().to_hex()
+        bucket = self.reply_buckets.get(author)
+        if bucket is None:
+            bucket = self.reply_buckets[author] = TokenBucket(*self.reply_rate)
+            if len(self.reply_buckets) > 10000:
+                self.reply_buckets.popitem(last=False)
+        else:
+            self.reply_buckets.move_to_end(author)
+        return bucket.try_acquire()
+    
+    def build_reply(self, parent, content):
+        """Build and sign a threaded reply to an incoming event"""
+        parent_id = parent.id().to_hex()
+        parent_author = parent.author().to_hex()
+        parent_kind = parent.kind().as_u16()
+        
+        if parent_kind != 1111:
+            # NIP-22 comments can't reply to kind 1 notes; use a NIP-10 reply
+            builder = nostr_sdk.EventBuilder.text_note_reply(content, parent)
+            return self.sign(builder, "1")
+        
+        # NIP-22: keep the parent's root scope (uppercase tags) and point
+        # the lowercase tags at the parent comment itself
+        tags = [tag for tag in parent.tags().to_vec() if tag.as_vec()[0] in ("I", "K", "E", "A", "P")]
+        tags += [
+            nostr_sdk.Tag.parse(["e", parent_id, "", parent_author]),
+            nostr_sdk.Tag.parse(["k", "1111"]),
+            nostr_sdk.Tag.parse(["p", parent_author]),
+            nostr_sdk.Tag.parse(["L", "agent"]),
+            nostr_sdk.Tag.parse(["l", "ai", "agent"])
+        ]
+        builder = nostr_sdk.EventBuilder(nostr_sdk.Kind(1111), content).tags(tags)
+        return self.sign(builder, "1111")
+    
+    async def answer_mentions(self):
+        """Worker: answer queued events and publish the replies"""
+        while True:
+            event = await self.inbox.get()
+            try:
+                if self.should_answer(event):
+                    session = self.conversations.get(event.author().to_hex())
+                    answer = self.brain.respond(event.content(), session).strip()
+                    await self.send_post(self.build_reply(event, answer))
+                    self.replies_sent += 1
+                    MENTIONS_TOTAL.labels("answered").inc()
+                else:
+                    MENTIONS_TOTAL.labels("cooldown").inc()
+                    log.debug("   ⏳ Not answering %s yet: reply rate reached", event.author().to_hex()[:12])
+            except Exception as e:
+                log.warning("   ✗ Reply failed: %s", e)
+            finally:
+                self.inbox.task_done()
+    
+    # ============================================
+    # SUBCLAW HISTORY
+    # ============================================
+    
+    def use_history(self, path="clawstr_history.db"):
+        """Keep a local, queryable copy of subclaw posts"""
+        self.history = History(path)
+        return self.history
+    
+    async def sync_history(self, subclaws=None, timeout=10, page_size=500):
+        """Fetch posts newer than each relay's cursor into the local history"""
+        if self.history is None:
+            self.use_history()
+        subclaws = list(subclaws or SUBCLAWS)
+        self.relay_urls()
+        
+        log.info("🔄 Syncing %d subclaw(s) from %d relays...", len(subclaws), len(self.relays))
+        jobs = [(relay_str, subclaw) for relay_str in self.relays for subclaw in subclaws]
+        results = await asyncio.gather(
+            *(self.sync_subclaw(relay_str, subclaw, timeout, page_size) for relay_str, subclaw in jobs),
+            return_exceptions=True
+        )
+        
+        added = 0
+        for (relay_str, subclaw), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                log.warning("   ✗ %s %s: %s", relay_str, subclaw, result, extra={"relay": relay_str, "subclaw": subclaw})
+            else:
+                added += result
+        log.info("   ✓ %d new post(s)", added, extra={"new_posts": added})
+        return added
+    
+    async def sync_subclaw(self, relay_str, subclaw, timeout, page_size):
+        """Sync one subclaw from one relay, paging back until we reach its cursor"""
+        since = self.history.since(relay_str, subclaw)
+        base = (
+            nostr_sdk.Filter()
+            .kind(nostr_sdk.Kind(1111))
+            .custom_tags(nostr_sdk.SingleLetterTag.uppercase(nostr_sdk.Alphabet.I), [subclaw])
+        )
+        if since is not None:
+            # Inclusive, so posts from the cursor's own second are fetched again
+            base = base.since(nostr_sdk.Timestamp.from_secs(since))
+        
+        added = 0
+        newest = since
+        until = None
+        while True:
+            page = base.limit(page_size)
+            if until is not None:
+                page = page.until(nostr_sdk.Timestamp.from_secs(until))
+            events = (await self.client.fetch_events_from(
+                [self.relay_url_map[relay_str]], page, timedelta(seconds=timeout)
+            )).to_vec()
+            if not events:
+                break
+            
+            added += self.history.add([event.as_json() for event in events])
+            stamps = [event.created_at().as_secs() for event in events]
+            newest = max(newest or 0, max(stamps))
+            oldest = min(stamps)
+            
+            # Relays may cap limit below page_size, so a short page can still
+            # have more behind it. Stop on what this relay returned, not on
+            # what is new to the history: other relays share most posts
+            if since is not None and oldest <= since:
+                break
+            if until is not None and oldest > until:
+                break   # the relay ignores until; paging would go nowhere
+            # until is inclusive; a page stuck inside one second moves past it
+            until = oldest if until is None or oldest < until else until - 1
+        
+        # Only advance the cursor after every page is stored
+        if newest is not None:
+            self.history.set_since(relay_str, subclaw, newest)
+        return added
+    
     def generate_intro_post(self):
         """Generate an introduction post"""
         return """Hello Clawstr! 👋
@@ -214,108 +1013,425 @@ Contract: 0x81bE0217E166182D35B21E7d65D2b2bb7EA4Cb07 (Base)
 #Nostr #Decentralization #AIAgents"""
 
 
+# ============================================
+# AGENT POOL
+# ============================================
+
+class Identity:
+    """One educator identity, its keys parsed once"""
+    
+    __slots__ = ("keys", "npub", "name", "slots", "in_flight", "sent", "failed")
+    
+    def __init__(self, keys, name=None, max_in_flight=4):
+        self.keys = keys
+        self.npub = keys.public_key().to_bech32()
+        self.name = name or self.npub[:16]
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.sent = 0
+        self.failed = 0
+
+
+class AgentPool:
+    """Many identities publishing over one shared set of relay connections"""
+    
+    def __init__(self, max_in_flight=4):
+        # The transport agent owns the Client, relay stats, hedging and
+        # outbox; identities only sign, so connections stay constant
+        self.transport = ClawstrAgent()
+        self.max_in_flight = max_in_flight
+        self.identities = {}   # npub -> Identity
+    
+    def add_identity(self, nsec, name=None):
+        """Parse an nsec once and add it to the pool"""
+        identity = Identity(nostr_sdk.Keys.parse(nsec), name, self.max_in_flight)
+        self.identities[identity.npub] = identity
+        return identity
+    
+    def load_keystore(self, path):
+        """Load identities from a file of "nsec [name]" lines (# starts a comment)"""
+        loaded = 0
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                nsec, _, name = line.partition(" ")
+                try:
+                    self.add_identity(nsec, name.strip() or None)
+                    loaded += 1
+                except Exception as e:
+                    # Never echo the line itself, it holds a secret key
+                    log.warning("   ✗ Keystore line %d: %s", line_number, type(e).__name__)
+        log.info("🔐 Loaded %d identities from %s", loaded, path)
+        return loaded
+    
+    def identity(self, who):
+        """Look an identity up by npub or name"""
+        identity = self.identities.get(who)
+        if identity is None:
+            identity = next((i for i in self.identities.values() if i.name == who), None)
+        if identity is None:
+            raise KeyError(f"Unknown identity: {who}")
+        return identity
+    
+    async def connect(self, quorum=1, timeout=10):
+        """Connect the shared relays once, however many identities there are"""
+        return await self.transport.connect(quorum, timeout)
+    
+    async def publish(self, who, content, subclaw=None):
+        """Sign a post as one identity and send it over the shared relays"""
+        identity = self.identity(who)
+        # Per-identity cap: one busy identity can't take every send slot
+        async with identity.slots:
+            identity.in_flight += 1
+            try:
+                event = self.transport.build_post(content, subclaw, identity.keys)
+                await self.transport.send_post(event)
+                identity.sent += 1
+                return event
+            except Exception:
+                identity.failed += 1
+                raise
+            finally:
+                identity.in_flight -= 1
+    
+    async def publish_many(self, posts):
+        """Publish many (identity, content, subclaw) posts concurrently"""
+        return await asyncio.gather(
+            *(self.publish(who, content, subclaw) for who, content, subclaw in posts),
+            return_exceptions=True
+        )
+    
+    def report(self):
+        """Per-identity send counters"""
+        return {
+            identity.name: {"npub": identity.npub, "in_flight": identity.in_flight,
+                            "sent": identity.sent, "failed": identity.failed}
+            for identity in self.identities.values()
+        }
+    
+    async def close(self):
+        """Flush and disconnect the shared transport"""
+        await self.transport.close()
+
+
 # ============================================
 # MAIN PROGRAM
 # ============================================
 
-async def main():
+async def ask(prompt):
+    """input() without blocking the event loop, so relay I/O keeps running"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(line, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line.strip())
+    
+    def read():
+        try:
+            loop.call_soon_threadsafe(settle, input(prompt), None)
+        except Exception as e:
+            loop.call_soon_threadsafe(settle, None, e)
+    
+    # A daemon thread rather than asyncio.to_thread: a prompt still
+    # waiting for a line must not keep the process alive on exit
+    threading.Thread(target=read, name="prompt", daemon=True).start()
+    return await future
+
+
+def show_secret_key(keys):
+    """Print a new identity's keys for the user to save (stdout, never the log)"""
+    print("\n🔐 NEW NOSTR IDENTITY GENERATED")
+    print("=" * 50)
+    print(f"Public Key (npub): {keys.public_key().to_bech32()}")
+    print(f"Secret Key (nsec): {keys.secret_key().to_bech32()}")
+    print("=" * 50)
+    print("\n⚠️  SAVE YOUR SECRET KEY! You'll need it to recover your agent.")
+    print()
+
+
+async def run_menu(agent):
+    """The interactive menu"""
     print()
     print("=" * 55)
     print("🦀 CLAWSTR EDUCATOR AGENT - NOSTR CONNECTED 🦀")
     print("=" * 55)
     print()
     
-    agent = ClawstrAgent()
-    
-    while True:
-        print("\nWhat would you like to do?")
-        print()
-        print("1. Generate new Nostr identity")
-        print("2. Load existing identity (nsec)")
-        print("3. Connect to Nostr relays")
-        print("4. Set up agent profile")
-        print("5. Post introduction to Clawstr (Kind 1111)")
-        print("6. Post about technology (Kind 1111)")
-        print("7. Custom post to Clawstr (Kind 1111)")
-        print("8. View my public key")
-        print("9. Exit")
-        print()
-        
-        choice = input("Enter choice (1-9): ").strip()
-        
-        if choice == "1":
-            agent.generate_keys()
-        
-        elif choice == "2":
-            nsec = input("\nEnter your nsec: ").strip()
-            agent.load_keys(nsec)
-        
-        elif choice == "3":
-            if agent.keys is None:
-                print("\n⚠️  Generate or load keys first!")
-            else:
-                await agent.connect()
-        
-        elif choice == "4":
-            if not agent.connected:
-                print("\n⚠️  Connect to relays first!")
-            else:
-                await agent.set_profile()
-        
-        elif choice == "5":
-            if not agent.connected:
-                print("\n⚠️  Connect to relays first!")
-            else:
-                content = agent.generate_intro_post()
-                print(f"\n📝 Preview:\n{content}")
-                confirm = input("\nPost this? (y/n): ").strip().lower()
-                if confirm == "y":
-                    await agent.post_to_subclaw(content)
-        
-        elif choice == "6":
-            if not agent.connected:
-                print("\n⚠️  Connect to relays first!")
-            else:
-                content = agent.generate_tech_post()
-                print(f"\n📝 Preview:\n{content}")
-                confirm = input("\nPost this? (y/n): ").strip().lower()
-                if confirm == "y":
-                    await agent.post_to_subclaw(content)
-        
-        elif choice == "7":
-            if not agent.connected:
-                print("\n⚠️  Connect to relays first!")
-            else:
-                print("\nAvailable subclaws:")
-                print("  - https://clawstr.com/c/ai")
-                print("  - https://clawstr.com/c/programming")
-                print("  - https://clawstr.com/c/videogames")
-                print("  - https://clawstr.com/c/bitcoin")
-                print("  - https://clawstr.com/c/nostr")
-                subclaw = input("\nSubclaw URL (or press Enter for /c/ai): ").strip()
-                if not subclaw:
-                    subclaw = "https://clawstr.com/c/ai"
-                
-                content = input("\nYour message: ").strip()
-                if content:
-                    confirm = input("\nPost this? (y/n): ").strip().lower()
+    # stdin can close at any prompt (piped or scripted use); leave as 9 does
+    try:
+        while True:
+            print("\nWhat would you like to do?")
+            print()
+            print("1. Generate new Nostr identity")
+            print("2. Load existing identity (nsec)")
+            print("3. Connect to Nostr relays")
+            print("4. Set up agent profile")
+            print("5. Post introduction to Clawstr (Kind 1111)")
+            print("6. Post about technology (Kind 1111)")
+            print("7. Custom post to Clawstr (Kind 1111)")
+            print("8. View my public key")
+            print("9. Exit")
+            print()
+            
+            choice = await ask("Enter choice (1-9): ")
+            
+            if choice == "1":
+                show_secret_key(agent.generate_keys())
+            
+            elif choice == "2":
+                nsec = await ask("\nEnter your nsec: ")
+                agent.load_keys(nsec)
+            
+            elif choice == "3":
+                if agent.keys is None:
+                    print("\n⚠️  Generate or load keys first!")
+                else:
+                    await agent.connect()
+            
+            elif choice == "4":
+                if not agent.connected:
+                    print("\n⚠️  Connect to relays first!")
+                else:
+                    await agent.set_profile()
+            
+            elif choice == "5":
+                if not agent.connected:
+                    print("\n⚠️  Connect to relays first!")
+                else:
+                    content = agent.generate_intro_post()
+                    print(f"\n📝 Preview:\n{content}")
+                    confirm = (await ask("\nPost this? (y/n): ")).lower()
                     if confirm == "y":
-                        await agent.post_to_subclaw(content, subclaw)
-        
-        elif choice == "8":
-            if agent.keys:
-                print(f"\n📍 Your public key: {agent.keys.public_key().to_bech32()}")
-                print(f"📍 Your profile: https://clawstr.com/{agent.keys.public_key().to_bech32()}")
+                        await agent.post_to_subclaw(content)
+            
+            elif choice == "6":
+                if not agent.connected:
+                    print("\n⚠️  Connect to relays first!")
+                else:
+                    content = agent.generate_tech_post()
+                    print(f"\n📝 Preview:\n{content}")
+                    confirm = (await ask("\nPost this? (y/n): ")).lower()
+                    if confirm == "y":
+                        await agent.post_to_subclaw(content)
+            
+            elif choice == "7":
+                if not agent.connected:
+                    print("\n⚠️  Connect to relays first!")
+                else:
+                    print("\nAvailable subclaws:")
+                    for url in SUBCLAWS:
+                        print(f"  - {url}")
+                    subclaw = await ask("\nSubclaw URL (or press Enter for /c/ai): ")
+                    if not subclaw:
+                        subclaw = "https://clawstr.com/c/ai"
+                    
+                    content = await ask("\nYour message: ")
+                    if content:
+                        confirm = (await ask("\nPost this? (y/n): ")).lower()
+                        if confirm == "y":
+                            await agent.post_to_subclaw(content, subclaw)
+            
+            elif choice == "8":
+                if agent.keys:
+                    print(f"\n📍 Your public key: {agent.keys.public_key().to_bech32()}")
+                    print(f"📍 Your profile: https://clawstr.com/{agent.keys.public_key().to_bech32()}")
+                else:
+                    print("\n⚠️  No keys loaded!")
+            
+            elif choice == "9":
+                break
+            
             else:
-                print("\n⚠️  No keys loaded!")
-        
-        elif choice == "9":
-            print("\n🦀 Goodbye! Stay decentralized!")
-            break
-        
+                print("\n⚠️  Invalid choice. Try 1-9.")
+    except EOFError:
+        pass
+    print("\n🦀 Goodbye! Stay decentralized!")
+
+
+# ============================================
+# COMMAND LINE
+# ============================================
+
+def read_nsec(args):
+    """The secret key from --nsec-file or $CLAWSTR_NSEC (never from argv)"""
+    if args.nsec_file:
+        with open(args.nsec_file) as f:
+            return f.read().strip()
+    return os.environ.get("CLAWSTR_NSEC", "").strip()
+
+
+def read_posts(args):
+    """Post contents from --file or stdin: the whole text, or one per line"""
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.file) as f:
+            text = f.read()
+    if args.lines:
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    return [text.strip()] if text.strip() else []
+
+
+async def run_command(agent, args):
+    """Run one subcommand without prompting; returns the exit code"""
+    if args.command == "keygen":
+        keys = agent.generate_keys()
+        if args.save:
+            # Secret key file readable by us only
+            fd = os.open(args.save, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(keys.secret_key().to_bech32() + "\n")
+            print(f"🔐 Secret key saved to {args.save}")
         else:
-            print("\n⚠️  Invalid choice. Try 1-9.")
+            show_secret_key(keys)
+        return 0
+    
+    # Syncing only reads, so it works without an identity
+    nsec = read_nsec(args)
+    if not nsec and args.command != "sync":
+        print("\n❌ No identity: pass --nsec-file or set CLAWSTR_NSEC")
+        return 2
+    if nsec and not agent.load_keys(nsec):
+        return 2
+    
+    if args.command == "post":
+        posts = read_posts(args)
+        if not posts:
+            print("\n❌ Nothing to post")
+            return 2
+    
+    await agent.connect(quorum=args.quorum, timeout=args.timeout)
+    if not agent.connected:
+        return 1
+    
+    if args.command == "connect":
+        print(json.dumps(agent.relay_status, indent=2))
+        return 0
+    
+    if args.command == "profile":
+        return 0 if await agent.set_profile(force=args.force, check_relays=args.check_relays) else 1
+    
+    if args.command == "sync":
+        await agent.sync_history(args.subclaws)
+        print_history(agent)
+        return 0
+    
+    if args.skip_posted:
+        # Catch up on the target subclaw, then drop what we already posted there
+        subclaw = args.subclaw or agent.default_subclaw
+        await agent.sync_history([subclaw])
+        pubkey = agent.keys.public_key().to_hex()
+        fresh = [content for content in posts if not agent.history.has_posted(pubkey, content, subclaw)]
+        print(f"   ⏭️  Skipping {len(posts) - len(fresh)} already posted")
+        posts = fresh
+        if not posts:
+            return 0
+    
+    if len(posts) == 1:
+        return 0 if await agent.post_to_subclaw(posts[0], args.subclaw) else 1
+    
+    # Bulk: sign across threads and stream the events through the publishing queue
+    await agent.start_publisher()
+    futures = []
+    async for event in agent.sign_batch((content, args.subclaw, None) for content in posts):
+        futures.append(await agent.publish(event))
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    failed = [result for result in results if isinstance(result, Exception)]
+    for error in failed:
+        print(f"   ✗ {error}")
+    print(f"\n✅ Posted {len(posts) - len(failed)}/{len(posts)} to {args.subclaw or agent.default_subclaw}")
+    return 1 if failed else 0
+
+
+def print_history(agent):
+    """Summary of the local history after a sync"""
+    for subclaw, count in sorted(agent.history.stats().items(), key=lambda item: str(item[0])):
+        print(f"   {subclaw}: {count} posts")
+    print("\n🏆 Top authors this week:")
+    for pubkey, count in agent.history.top_authors(days=7, limit=5):
+        print(f"   {pubkey[:16]}… {count}")
+    if agent.keys is not None:
+        replies = agent.history.replies_to(agent.keys.public_key().to_hex(), limit=5)
+        print(f"\n💬 Latest replies to us: {len(replies)}")
+        for _, pubkey, _, _, content in replies:
+            print(f"   {pubkey[:16]}…: {content[:60]}")
+
+
+def add_common_options(parser, suppress=False):
+    """Options shared by the menu and every subcommand"""
+    def default(value):
+        return argparse.SUPPRESS if suppress else value
+    
+    parser.add_argument("--nsec-file", default=default(None), help="file holding the agent's nsec (default: $CLAWSTR_NSEC)")
+    parser.add_argument("--relay", action="append", dest="relays", default=default(None), metavar="URL",
+                        help="relay to use instead of the recommended ones (repeatable)")
+    parser.add_argument("--quorum", type=int, default=default(1), help="relays that must connect before going on (default: 1)")
+    parser.add_argument("--timeout", type=float, default=default(10), help="relay connect timeout in seconds (default: 10)")
+    parser.add_argument("--no-outbox", action="store_true", default=default(False), help="don't keep signed events in the local outbox")
+    parser.add_argument("--metrics-port", type=int, default=default(None), help="serve Prometheus metrics on this local port")
+
+
+def parse_args(argv=None):
+    """Command line: no subcommand opens the interactive menu"""
+    parser = argparse.ArgumentParser(description="Clawstr Educator Agent - Nostr connected")
+    add_common_options(parser)
+    
+    def command(name, help_text):
+        # SUPPRESS so a subcommand doesn't reset options given before it
+        subparser = commands.add_parser(name, help=help_text)
+        add_common_options(subparser, suppress=True)
+        return subparser
+    
+    commands = parser.add_subparsers(dest="command")
+    
+    keygen = command("keygen", "generate a new identity")
+    keygen.add_argument("--save", metavar="PATH", help="write the nsec to this file (mode 600)")
+    
+    command("connect", "connect and print the relay status")
+    profile = command("profile", "publish the agent profile (kind 0) where it changed")
+    profile.add_argument("--check-relays", action="store_true", help="ask the relays for the current profile first")
+    profile.add_argument("--force", action="store_true", help="publish to every relay even if unchanged")
+    
+    post = command("post", "post from a file or stdin (kind 1111)")
+    post.add_argument("--file", default="-", help="read the post from this file (default: stdin)")
+    post.add_argument("--lines", action="store_true", help="post every non-empty line separately")
+    post.add_argument("--subclaw", help="subclaw URL (default: https://clawstr.com/c/ai)")
+    post.add_argument("--skip-posted", action="store_true", help="sync first and skip posts we already made there")
+    
+    sync = command("sync", "fetch new subclaw posts into the local history")
+    sync.add_argument("--subclaw", action="append", dest="subclaws", metavar="URL",
+                      help="subclaw to sync (repeatable, default: all listed subclaws)")
+    
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    logs.setup()
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    
+    agent = ClawstrAgent()
+    if args.relays:
+        agent.relays = args.relays
+    if not args.no_outbox:
+        agent.use_outbox()
+    
+    try:
+        if args.command is None:
+            await run_menu(agent)
+            return 0
+        return await run_command(agent, args)
+    finally:
+        await agent.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,21 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - TEST FIXTURES
+# Shared by the test_*.py files; nothing here
+# touches the real relays or the user's files
+# ============================================
+
+from clawstr_agent import ClawstrAgent
+import nostr_sdk
+import pytest
+
+
+@pytest.fixture
+def make_agent():
+    """Build agents with a throwaway identity, pointed at the given relays"""
+    def make(*urls, keys=None):
+        agent = ClawstrAgent()
+        agent.keys = keys or nostr_sdk.Keys.generate()
+        agent.signer = nostr_sdk.NostrSigner.keys(agent.keys)
+        agent.relays = list(urls)
+        return agent
+    return make
@@ -0,0 +1,143 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - EVENT DEDUP
+# Fast "seen this event id?" checks with a
+# fixed memory cap, for events that arrive
+# once per relay
+# ============================================
+
+from collections import OrderedDict
+import hashlib
+import math
+import time
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over event ids"""
+    
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, min(8, round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def positions(self, event_id):
+        """Bit positions for an id (event ids are already sha256 digests)"""
+        try:
+            digest = bytes.fromhex(event_id)
+        except ValueError:
+            digest = b""
+        if len(digest) < 32:
+            digest = hashlib.sha256(event_id.encode()).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[i * 4:i * 4 + 4], "little") % self.size
+    
+    def add(self, event_id):
+        """Remember an id"""
+        for pos in self.positions(event_id):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, event_id):
+        """Whether the id was (probably) added"""
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(event_id))
+    
+    def is_full(self):
+        """Whether the filter reached the capacity it was sized for"""
+        return self.count >= self.capacity
+
+
+class EventDeduplicator:
+    """Exact LRU/TTL set of recent event ids backed by rotating Bloom filters"""
+    
+    def __init__(self, max_recent=50000, ttl=600, bloom_capacity=1000000, error_rate=0.001):
+        self.max_recent = max_recent
+        self.ttl = ttl
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        
+        # id -> time first seen, oldest first
+        self.recent = OrderedDict()
+        
+        # Two generations: when the current one fills up the older one is
+        # dropped, so memory stays fixed no matter how many ids go through
+        self.current = BloomFilter(bloom_capacity, error_rate)
+        self.previous = BloomFilter(bloom_capacity, error_rate)
+        
+        self.hits = 0
+        self.bloom_hits = 0
+        self.misses = 0
+    
+    def seen(self, event_id):
+        """Return True if the id was seen before, remembering it either way"""
+        if event_id in self.recent:
+            self.hits += 1
+            return True
+        if event_id in self.current or event_id in self.previous:
+            self.bloom_hits += 1
+            return True
+        
+        self.misses += 1
+        self.recent[event_id] = time.monotonic()
+        self.expire()
+        return False
+    
+    def expire(self):
+        """Move ids past the size cap or TTL from the exact set to the filter"""
+        cutoff = time.monotonic() - self.ttl
+        while self.recent:
+            event_id, first_seen = next(iter(self.recent.items()))
+            if len(self.recent) <= self.max_recent and first_seen >= cutoff:
+                break
+            del self.recent[event_id]
+            self.archive(event_id)
+    
+    def archive(self, event_id):
+        """Add an id to the current filter, rotating generations when full"""
+        if self.current.is_full():
+            self.previous = self.current
+            self.current = BloomFilter(self.bloom_capacity, self.error_rate)
+        self.current.add(event_id)
+    
+    def memory_bytes(self):
+        """Approximate memory held by the filters (the exact set is capped separately)"""
+        return len(self.current.bits) + len(self.previous.bits)
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        return {
+            "hits": self.hits,
+            "bloom_hits": self.bloom_hits,
+            "misses": self.misses,
+            "recent": len(self.recent),
+            "bloom_bytes": self.memory_bytes()
+        }
+
+
+# ============================================
+# MEMORY BENCHMARK
+# ============================================
+
+def run_benchmark(total=10000000, report_every=1000000):
+    """Push fresh ids through the deduplicator and show memory staying flat"""
+    import resource
+    
+    dedup = EventDeduplicator()
+    started = time.perf_counter()
+    print(f"{'ids':>12} {'max rss MB':>11} {'bloom MB':>9} {'ids/s':>10}")
+    for n in range(1, total + 1):
+        dedup.seen(hashlib.sha256(n.to_bytes(8, "little")).hexdigest())
+        if n % report_every == 0:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            rate = n / (time.perf_counter() - started)
+            print(f"{n:>12,} {rss:>11.1f} {dedup.memory_bytes() / 1e6:>9.1f} {rate:>10,.0f}")
+    print(dedup.stats())
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Event dedup memory benchmark")
+    parser.add_argument("--ids", type=int, default=10000000, help="number of distinct ids (default: 10,000,000)")
+    args = parser.parse_args()
+    run_benchmark(args.ids, max(1, args.ids // 10))
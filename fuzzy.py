@@ -0,0 +1,117 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - TYPO TOLERANCE
+# A SymSpell-style deletion index, so
+# "nostrr" and "contarct" still find their
+# intent without scanning the vocabulary
+# ============================================
+
+import re
+
+WORD = re.compile(r"[a-z0-9]+")
+
+# Everyday words within a typo of a keyword; they mean what they say
+# ("contact" isn't "contract"), so they never match fuzzily
+REAL_WORDS = frozenset({
+    "contact", "contacts", "contacted", "contrast", "contrasts",
+    "develop", "develops", "developed", "difference", "differences",
+    "hell", "prince", "rice", "toke"
+})
+
+
+def deletes(word, distance):
+    """Every string reachable from word by removing up to `distance` characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions count once), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class TypoIndex:
+    """Deletion index over single-word intent keywords"""
+    
+    def __init__(self, intents, min_length=5, max_token=24):
+        self.min_length = min_length
+        self.max_token = max_token
+        self.keywords = {}   # keyword -> intent
+        self.index = {}      # deleted form -> keywords it came from
+        for intent, keywords in intents:
+            for keyword in keywords:
+                # Short words and phrases only match exactly; a typo
+                # in "hi" or "ca" is indistinguishable from another word
+                if " " in keyword or len(keyword) < min_length:
+                    continue
+                self.keywords.setdefault(keyword, intent)
+                for form in deletes(keyword, self.allowed(keyword)):
+                    self.index.setdefault(form, set()).add(keyword)
+    
+    def allowed(self, word):
+        """Edits tolerated for a word of this length"""
+        return 2 if len(word) >= 8 else 1
+    
+    def lookup(self, token):
+        """Closest keyword to a token as (keyword, intent, confidence), or None"""
+        if len(token) < self.min_length - 1 or len(token) > self.max_token:
+            return None
+        if token in self.keywords:
+            return token, self.keywords[token], 1.0
+        if token in REAL_WORDS:
+            return None
+        
+        # A keyword is usually reachable through several deleted forms,
+        # so collect the candidates first and verify each one once
+        candidates = set()
+        for form in deletes(token, self.allowed(token)):
+            candidates.update(self.index.get(form, ()))
+        
+        best = None
+        for keyword in candidates:
+            # In short words a swapped letter is usually a different
+            # word ("taken" isn't "token"), so only allow missing,
+            # extra or transposed letters there
+            if len(keyword) < 8 and len(token) == len(keyword) and sorted(token) != sorted(keyword):
+                continue
+            limit = self.allowed(keyword)
+            distance = edit_distance(token, keyword, limit)
+            if distance > limit:
+                continue
+            confidence = 1 - distance / len(keyword)
+            if best is None or confidence > best[2]:
+                best = (keyword, self.keywords[keyword], confidence)
+        return best
+    
+    def match(self, message_lower, priority, min_confidence=0.75):
+        """Best fuzzy intent in a message as (intent, confidence), or (None, 0.0)"""
+        best_intent, best_key = None, None
+        for token in set(WORD.findall(message_lower)):
+            hit = self.lookup(token)
+            if hit is None or hit[2] < min_confidence:
+                continue
+            _, intent, confidence = hit
+            # Most confident wins; intent priority breaks ties
+            key = (-confidence, priority[intent])
+            if best_key is None or key < best_key:
+                best_intent, best_key = intent, key
+        if best_intent is None:
+            return None, 0.0
+        return best_intent, -best_key[0]
@@ -0,0 +1,150 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - SUBCLAW HISTORY
+# A local SQLite copy of Kind 1111 posts,
+# synced incrementally with per-relay cursors
+# ============================================
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def content_hash(content):
+    """Hash of a post's text, ignoring surrounding whitespace"""
+    return hashlib.sha256(content.strip().encode()).hexdigest()
+
+
+def first_tag(tags, name):
+    """Value of the first tag with this name, or None"""
+    for tag in tags:
+        if len(tag) > 1 and tag[0] == name:
+            return tag[1]
+    return None
+
+
+class History:
+    """SQLite index of subclaw posts by subclaw, author, parent author and time"""
+    
+    def __init__(self, path="clawstr_history.db"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # A cache of what relays already hold, so it can trade durability for speed
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "id TEXT PRIMARY KEY, pubkey TEXT NOT NULL, subclaw TEXT, "
+                "created_at INTEGER NOT NULL, parent_id TEXT, parent_pubkey TEXT, "
+                "content_hash TEXT NOT NULL, content TEXT NOT NULL, json TEXT NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS posts_subclaw ON posts (subclaw, created_at)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS posts_author ON posts (pubkey, created_at)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS posts_parent ON posts (parent_pubkey, created_at)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS posts_content ON posts (content_hash)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS cursors ("
+                "relay TEXT NOT NULL, subclaw TEXT NOT NULL, since INTEGER NOT NULL, "
+                "PRIMARY KEY (relay, subclaw))"
+            )
+    
+    def add(self, event_jsons):
+        """Store signed events given as JSON; returns how many were new"""
+        rows = []
+        for event_json in event_jsons:
+            event = json.loads(event_json)
+            tags = event.get("tags", [])
+            rows.append((
+                event["id"],
+                event["pubkey"],
+                # NIP-22: "I" is the root scope (the subclaw), "e"/"p" the parent
+                first_tag(tags, "I"),
+                event["created_at"],
+                first_tag(tags, "e"),
+                first_tag(tags, "p"),
+                content_hash(event["content"]),
+                event["content"],
+                event_json
+            ))
+        with self.lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO posts (id, pubkey, subclaw, created_at, parent_id, "
+                "parent_pubkey, content_hash, content, json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return self.db.total_changes - before
+    
+    def since(self, relay, subclaw):
+        """Timestamp to resume syncing a subclaw from a relay, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT since FROM cursors WHERE relay = ? AND subclaw = ?", (relay, subclaw)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_since(self, relay, subclaw, since):
+        """Move a relay's cursor forward (never back)"""
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO cursors (relay, subclaw, since) VALUES (?, ?, ?) "
+                "ON CONFLICT (relay, subclaw) DO UPDATE SET since = max(since, excluded.since)",
+                (relay, subclaw, since)
+            )
+    
+    # ============================================
+    # QUERIES
+    # ============================================
+    
+    def has_posted(self, pubkey, content, subclaw=None):
+        """Whether this author already posted this text (in this subclaw)"""
+        sql = "SELECT 1 FROM posts WHERE content_hash = ? AND pubkey = ?"
+        params = [content_hash(content), pubkey]
+        if subclaw is not None:
+            sql += " AND subclaw = ?"
+            params.append(subclaw)
+        with self.lock:
+            return self.db.execute(sql + " LIMIT 1", params).fetchone() is not None
+    
+    def latest(self, subclaw, limit=20):
+        """Newest posts in a subclaw as (id, pubkey, created_at, content)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, pubkey, created_at, content FROM posts WHERE subclaw = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (subclaw, limit)
+            ).fetchall()
+    
+    def replies_to(self, pubkey, limit=20):
+        """Newest replies to an author as (id, pubkey, subclaw, created_at, content)"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, pubkey, subclaw, created_at, content FROM posts "
+                "WHERE parent_pubkey = ? AND pubkey != ? ORDER BY created_at DESC LIMIT ?",
+                (pubkey, pubkey, limit)
+            ).fetchall()
+    
+    def top_authors(self, subclaw=None, days=7, limit=10):
+        """Most active authors over the last few days as (pubkey, posts)"""
+        sql = "SELECT pubkey, count(*) AS n FROM posts WHERE created_at >= ?"
+        params = [int(time.time() - days * 86400)]
+        if subclaw is not None:
+            sql += " AND subclaw = ?"
+            params.append(subclaw)
+        sql += " GROUP BY pubkey ORDER BY n DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+    
+    def stats(self):
+        """Post count per subclaw"""
+        with self.lock:
+            return dict(self.db.execute("SELECT subclaw, count(*) FROM posts GROUP BY subclaw").fetchall())
+    
+    def close(self):
+        """Close the database"""
+        with self.lock:
+            self.db.close()
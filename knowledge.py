@@ -0,0 +1,219 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - KNOWLEDGE BASE
+# Sections loaded lazily from a JSON Lines
+# file, plus a BM25 index over every fact
+# ============================================
+
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+import heapq
+import json
+import math
+import os
+import re
+import time
+import zlib
+
+# Each line of the knowledge file is one section:
+# {"section": "<name>", "data": {...}}
+SECTION_NAME = re.compile(rb'^\s*\{\s*"section"\s*:\s*"([^"]+)"')
+
+WORD = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "about", "an", "and", "are", "can", "do", "does", "for", "how", "i",
+    "in", "is", "it", "me", "of", "on", "or", "tell", "the", "this", "to",
+    "what", "who", "why", "with", "you"
+}
+
+
+def tokenize(text):
+    """Lowercase word tokens without stop words or stray letters"""
+    return [word for word in WORD.findall(text.lower()) if len(word) > 1 and word not in STOP_WORDS]
+
+
+class KnowledgeBase(Mapping):
+    """Knowledge sections from a JSON Lines file, each parsed on first access"""
+    
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.lines = {}      # section -> (start, end) byte offsets
+        self.checksums = {}  # section -> crc32 of its line
+        self.sections = {}   # section -> parsed data, filled on demand
+        self.stamp = None
+        self.last_check = time.monotonic()
+        # Sections a rescan on access found changed, for the next refresh()
+        self.changed = set()
+        self.scan()
+    
+    def scan(self):
+        """Map every section to its line in the file; returns the changed sections"""
+        # Only offsets and checksums are kept: a file held open (or mapped)
+        # would go stale, or fault, when it is rewritten in place
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        
+        lines = {}
+        checksums = {}
+        start = 0
+        while start < len(content):
+            end = content.find(b"\n", start)
+            if end == -1:
+                end = len(content)
+            line = content[start:end]
+            if line.strip():
+                match = SECTION_NAME.match(line)
+                name = match.group(1).decode() if match else json.loads(line)["section"]
+                lines[name] = (start, end)
+                checksums[name] = zlib.crc32(line)
+            start = end + 1
+        
+        changed = {name for name in checksums.keys() | self.checksums.keys()
+                   if checksums.get(name) != self.checksums.get(name)}
+        self.lines = lines
+        self.checksums = checksums
+        for name in changed:
+            self.sections.pop(name, None)
+        return changed
+    
+    def refresh(self):
+        """Rescan the file if it changed on disk; returns the changed sections"""
+        changed, self.changed = self.changed, set()
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return changed
+        self.last_check = now
+        
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return changed
+        if (stat.st_mtime_ns, stat.st_size) == self.stamp:
+            return changed
+        return changed | self.scan()
+    
+    def read_line(self, name):
+        """A section's line as it is on disk now, at the offsets of the last scan"""
+        start, end = self.lines[name]
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+    
+    def __getitem__(self, name):
+        data = self.sections.get(name)
+        if data is None:
+            for _ in range(3):
+                line = self.read_line(name)
+                if zlib.crc32(line) == self.checksums[name]:
+                    break
+                # Rewritten since the last scan: find the section's new line
+                self.changed |= self.scan()
+            else:
+                # Still being written; the next access tries again
+                raise KeyError(name)
+            data = self.sections[name] = json.loads(line)["data"]
+        return data
+    
+    def __iter__(self):
+        return iter(self.lines)
+    
+    def __len__(self):
+        return len(self.lines)
+
+
+class FactIndex:
+    """BM25 inverted index over every fact (leaf string) in the knowledge base"""
+    
+    def __init__(self, knowledge, k1=1.2, b=0.75):
+        self.knowledge = knowledge
+        self.k1 = k1
+        self.b = b
+        self.facts = {}                       # (section, n) -> (label, text)
+        self.lengths = {}                     # (section, n) -> token count
+        self.by_section = defaultdict(list)   # section -> its fact keys
+        self.postings = defaultdict(dict)     # term -> {fact key: term freq}
+        self.norms = None                     # (section, n) -> BM25 length norm
+        self.total_length = 0
+        self.update(list(knowledge))
+    
+    def update(self, sections):
+        """Re-index only the given sections"""
+        self.norms = None
+        for section in sections:
+            self.remove(section)
+            if section in self.knowledge:
+                self.add(section, self.knowledge[section])
+    
+    def remove(self, section):
+        """Drop a section's facts from the index"""
+        for key in self.by_section.pop(section, []):
+            label, text = self.facts.pop(key)
+            self.total_length -= self.lengths.pop(key)
+            for term in set(tokenize(f"{section} {label} {text}")):
+                postings = self.postings[term]
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[term]
+    
+    def add(self, section, data):
+        """Index every fact in a section"""
+        for n, (path, text) in enumerate(self.leaves(data)):
+            key = (section, n)
+            label = " ".join(path).replace("_", " ")
+            tokens = tokenize(f"{section} {label} {text}")
+            self.facts[key] = (label, text)
+            self.lengths[key] = len(tokens)
+            self.total_length += len(tokens)
+            self.by_section[section].append(key)
+            for term, count in Counter(tokens).items():
+                self.postings[term][key] = count
+    
+    def leaves(self, data, path=()):
+        """Yield (key path, text) for every string in a nested section"""
+        if isinstance(data, dict):
+            for name, value in data.items():
+                yield from self.leaves(value, path + (name,))
+        elif isinstance(data, list):
+            for value in data:
+                yield from self.leaves(value, path)
+        elif isinstance(data, str):
+            yield path, data
+    
+    def length_norms(self):
+        """Per-fact BM25 length normalization, recomputed after updates"""
+        if self.norms is None:
+            avg_length = self.total_length / len(self.facts)
+            self.norms = {
+                key: self.k1 * (1 - self.b + self.b * length / avg_length)
+                for key, length in self.lengths.items()
+            }
+        return self.norms
+    
+    def search(self, query, limit=3, min_score=1.0):
+        """Best matching facts as (score, label, text), best first"""
+        if not self.facts:
+            return []
+        n = len(self.facts)
+        norms = self.length_norms()
+        
+        terms = [(term, self.postings[term]) for term in set(tokenize(query)) if term in self.postings]
+        if not terms:
+            return []
+        # Common terms barely move the ranking but cost the most to score,
+        # so skip them unless nothing rarer was asked for
+        common = max(64, n // 10)
+        rare = [(term, postings) for term, postings in terms if len(postings) <= common]
+        terms = rare or [min(terms, key=lambda item: len(item[1]))]
+        
+        scores = defaultdict(float)
+        for term, postings in terms:
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (self.k1 + 1)
+            for key, freq in postings.items():
+                scores[key] += boost * freq / (freq + norms[key])
+        
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, *self.facts[key]) for key, score in best if score >= min_score]
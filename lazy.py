@@ -0,0 +1,27 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - LAZY IMPORTS
+# Heavy modules load on first use, so commands
+# that never touch them start fast
+# ============================================
+
+import importlib
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+    
+    def __init__(self, name):
+        self._lazy_name = name
+        self._lazy_module = None
+    
+    def __getattr__(self, attr):
+        # Only called for names not cached on the instance yet
+        if self._lazy_module is None:
+            self._lazy_module = importlib.import_module(self._lazy_name)
+        value = getattr(self._lazy_module, attr)
+        setattr(self, attr, value)
+        return value
+    
+    def __repr__(self):
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module {self._lazy_name!r} ({state})>"
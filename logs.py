@@ -0,0 +1,154 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - LOGGING
+# Leveled logs written to stderr by a background
+# thread, as text or JSON lines, with secret
+# keys redacted before they leave the caller
+# Env: CLAWSTR_LOG_LEVEL=DEBUG|INFO|WARNING|ERROR
+#      CLAWSTR_LOG_FORMAT=text|json
+# ============================================
+
+import atexit
+import functools
+import json
+import logging
+import os
+import re
+import sys
+
+# bech32 secret keys, valid or mistyped; the hex form is indistinguishable
+# from ids, so code must never log it in the first place
+NSEC_PATTERN = re.compile(r"nsec1[0-9a-z]+")
+REDACTED = "nsec1…[redacted]"
+
+# Attributes every LogRecord has; anything else came in through extra=
+RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# The queue handler and its writer thread, once set up
+handler = None
+listener = None
+
+
+def get_logger(name):
+    """Logger under the "clawstr" namespace (e.g. clawstr.agent), masking secret keys"""
+    logger = logging.getLogger(f"clawstr.{name}")
+    # On the logger itself, so masking doesn't wait for setup(): without it
+    # records go to the root's handlers or logging's lastResort instead
+    logger.addFilter(redacting_filter)
+    return logger
+
+
+def redact(value):
+    """Mask every nsec in a string, or anywhere inside a dict, list, tuple or set"""
+    if isinstance(value, str):
+        return NSEC_PATTERN.sub(REDACTED, value) if "nsec1" in value else value
+    if isinstance(value, dict):
+        return {redact(key): redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        # As a list, the way JSON writes any of them
+        return [redact(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    # Anything else would be written out as str(value) (see JsonFormatter)
+    return redact(str(value))
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secret keys in a record's message, traceback, stack and extra= fields"""
+    
+    def filter(self, record):
+        message = record.getMessage()
+        if "nsec1" in message:
+            record.msg = redact(message)
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            # Rendered here, so any handler's formatter reuses the masked text
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        if record.stack_info:
+            record.stack_info = redact(record.stack_info)
+        # Copies, so the caller's own dicts and lists are left as they were
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS:
+                setattr(record, key, redact(value))
+        return True
+
+
+redacting_filter = RedactingFilter()
+
+
+@functools.lru_cache(maxsize=None)
+def queue_handler_class():
+    """RedactingQueueHandler, defined on first use so logging.handlers loads only in setup()"""
+    import logging.handlers
+    
+    class RedactingQueueHandler(logging.handlers.QueueHandler):
+        """Queue handler that masks secret keys again once the record is rendered"""
+        
+        def prepare(self, record):
+            # Runs in the caller, after the message and traceback are rendered;
+            # covers loggers not made by get_logger(), which lack the filter
+            record = super().prepare(record)
+            redacting_filter.filter(record)
+            return record
+    
+    return RedactingQueueHandler
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extra= fields"""
+    
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage().strip()
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS:
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup(level=None, fmt=None, stream=None):
+    """Route clawstr.* logs through a queue to a writer thread; safe to call twice"""
+    import logging.handlers
+    import queue
+    
+    global handler, listener
+    level = (level or os.environ.get("CLAWSTR_LOG_LEVEL") or "INFO").upper()
+    fmt = fmt or os.environ.get("CLAWSTR_LOG_FORMAT") or "text"
+    
+    root = logging.getLogger("clawstr")
+    root.setLevel(level)
+    if handler is not None:
+        return root
+    
+    # Human output keeps the console looking like it always has
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s"))
+    
+    # Callers only format and enqueue; the stream is written by the listener
+    # thread, so a slow terminal or pipe never holds up the event loop
+    records = queue.SimpleQueue()
+    handler = queue_handler_class()(records)
+    root.addHandler(handler)
+    root.propagate = False
+    
+    listener = logging.handlers.QueueListener(records, writer)
+    listener.start()
+    atexit.register(shutdown)
+    return root
+
+
+def shutdown():
+    """Write out queued records and stop the writer thread"""
+    global handler, listener
+    if handler is None:
+        return
+    logging.getLogger("clawstr").removeHandler(handler)
+    listener.stop()
+    atexit.unregister(shutdown)
+    handler = None
+    listener = None
@@ -0,0 +1,242 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - METRICS
+# Counters, gauges and latency histograms,
+# exported as Prometheus text or JSON
+# ============================================
+
+from bisect import bisect_left
+import functools
+import json
+import threading
+
+# Latency buckets in seconds, from 10 µs (respond) up to 10 s (relays)
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class CounterValue:
+    """One labelled counter"""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount=1):
+        """Add to the counter"""
+        self.value += amount
+    
+    def sample(self):
+        """Current value"""
+        return self.value
+
+
+class GaugeValue:
+    """One labelled gauge, either set directly or read from a function"""
+    
+    __slots__ = ("value", "function")
+    
+    def __init__(self):
+        self.value = 0
+        self.function = None
+    
+    def set(self, value):
+        """Set the gauge"""
+        self.value = value
+    
+    def set_function(self, function):
+        """Read the gauge from function() at export time (e.g. a queue size)"""
+        self.function = function
+    
+    def sample(self):
+        """Current value"""
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class HistogramValue:
+    """One labelled histogram with fixed buckets"""
+    
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        """Record one measurement"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def sample(self):
+        """Cumulative bucket counts, sum and count"""
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+class Metric:
+    """A named metric family; one value per distinct label set"""
+    
+    def __init__(self, kind, name, help_text, labelnames, make_value):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.make_value = make_value
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def labels(self, *labelvalues):
+        """The value for a label set, created on first use"""
+        value = self.values.get(labelvalues)
+        if value is None:
+            with self.lock:
+                value = self.values.setdefault(labelvalues, self.make_value())
+        return value
+    
+    def samples(self):
+        """(label values, value) pairs for export"""
+        with self.lock:
+            return list(self.values.items())
+
+
+class Registry:
+    """All metrics of the process"""
+    
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+    
+    def register(self, kind, name, help_text, labelnames, make_value):
+        """Get or create a metric family by name"""
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric(kind, name, help_text, labelnames, make_value)
+            return metric
+    
+    def counter(self, name, help_text, labelnames=()):
+        """A monotonically increasing counter"""
+        return self.register("counter", name, help_text, labelnames, CounterValue)
+    
+    def gauge(self, name, help_text, labelnames=()):
+        """A value that goes up and down"""
+        return self.register("gauge", name, help_text, labelnames, GaugeValue)
+    
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        """A bucketed distribution, latency in seconds by default"""
+        return self.register("histogram", name, help_text, labelnames, lambda: HistogramValue(buckets))
+    
+    def snapshot(self):
+        """Every metric as plain data, ready for json.dumps"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            snapshot[metric.name] = {
+                "type": metric.kind,
+                "help": metric.help,
+                "values": [
+                    {"labels": dict(zip(metric.labelnames, labelvalues)), "value": value.sample()}
+                    for labelvalues, value in metric.samples()
+                ]
+            }
+        return snapshot
+    
+    def to_prometheus(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labelvalues, value in metric.samples():
+                labels = list(zip(metric.labelnames, labelvalues))
+                sample = value.sample()
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{format_labels(labels)} {sample}")
+                    continue
+                for bound, count in sample["buckets"]:
+                    lines.append(f"{metric.name}_bucket{format_labels(labels + [('le', bound)])} {count}")
+                lines.append(f"{metric.name}_bucket{format_labels(labels + [('le', '+Inf')])} {sample['count']}")
+                lines.append(f"{metric.name}_sum{format_labels(labels)} {sample['sum']}")
+                lines.append(f"{metric.name}_count{format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    """Render [(name, value)] as a Prometheus label block"""
+    if not labels:
+        return ""
+    escaped = ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+    return "{" + escaped + "}"
+
+
+def escape(value):
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# The process-wide registry every module records into
+REGISTRY = Registry()
+
+
+# ============================================
+# SCRAPE ENDPOINT
+# ============================================
+
+@functools.lru_cache(maxsize=None)
+def handler_class():
+    """MetricsHandler, defined on first use so http.server only loads when serving"""
+    from http.server import BaseHTTPRequestHandler
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """GET /metrics (Prometheus text) and GET /metrics.json (snapshot)"""
+        
+        registry = REGISTRY
+        
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = self.registry.to_prometheus().encode()
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(self.registry.snapshot()).encode()
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Keep scrapes out of the console
+            pass
+    
+    return MetricsHandler
+
+
+def serve(port=9464, host="127.0.0.1"):
+    """Serve the metrics over HTTP from a background thread"""
+    from http.server import ThreadingHTTPServer
+    
+    server = ThreadingHTTPServer((host, port), handler_class())
+    thread = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    return server
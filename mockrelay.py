@@ -0,0 +1,371 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - MOCK RELAY
+# An in-process Nostr relay (NIP-01 over a
+# minimal websocket server) with configurable
+# latency, jitter, drops and rejections, for
+# repeatable load and latency tests offline
+# Run: python mockrelay.py --port 7777
+# ============================================
+
+from ratelimit import TokenBucket
+import asyncio
+import base64
+import hashlib
+import json
+import random
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Websocket opcodes
+CONTINUATION, TEXT, BINARY, CLOSE, PING, PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def event_id(event):
+    """NIP-01 id: sha256 of the canonical [0, pubkey, created_at, kind, tags, content]"""
+    serialized = json.dumps(
+        [0, event["pubkey"], event["created_at"], event["kind"], event["tags"], event["content"]],
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def matches(event, event_filter):
+    """Whether an event matches one NIP-01 filter"""
+    if "ids" in event_filter and event["id"] not in event_filter["ids"]:
+        return False
+    if "authors" in event_filter and event["pubkey"] not in event_filter["authors"]:
+        return False
+    if "kinds" in event_filter and event["kind"] not in event_filter["kinds"]:
+        return False
+    if "since" in event_filter and event["created_at"] < event_filter["since"]:
+        return False
+    if "until" in event_filter and event["created_at"] > event_filter["until"]:
+        return False
+    for key, values in event_filter.items():
+        if key.startswith("#") and len(key) == 2:
+            if not any(len(tag) > 1 and tag[0] == key[1] and tag[1] in values for tag in event["tags"]):
+                return False
+    return True
+
+
+class Connection:
+    """One websocket client: frame reading/writing and its subscriptions"""
+    
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.send_lock = asyncio.Lock()
+        self.subscriptions = {}   # subscription id -> filters
+        self.closed = False
+    
+    async def handshake(self, relay):
+        """Answer the HTTP upgrade (or a NIP-11 info request); True if upgraded"""
+        request = await self.reader.readuntil(b"\r\n\r\n")
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        key = headers.get("sec-websocket-key")
+        if key is None or "websocket" not in headers.get("upgrade", "").lower():
+            body = json.dumps(relay.info()).encode()
+            self.writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/nostr+json\r\n"
+                b"Access-Control-Allow-Origin: *\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await self.writer.drain()
+            return False
+        
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        return True
+    
+    async def read_frame(self):
+        """Next (opcode, payload) from the client"""
+        first, second = await self.reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await self.reader.readexactly(2), "big")
+        elif length == 127:
+            length = int.from_bytes(await self.reader.readexactly(8), "big")
+        mask = await self.reader.readexactly(4) if second & 0x80 else None
+        payload = await self.reader.readexactly(length)
+        if mask and length:
+            # Unmask the whole payload as one big integer XOR
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+        return first & 0x80, opcode, payload
+    
+    async def read_message(self):
+        """Next complete text message, answering pings; None once closed"""
+        parts = []
+        while True:
+            fin, opcode, payload = await self.read_frame()
+            if opcode == PING:
+                await self.send_frame(PONG, payload)
+                continue
+            if opcode == PONG:
+                continue
+            if opcode == CLOSE:
+                await self.send_frame(CLOSE, payload[:2])
+                return None
+            parts.append(payload)
+            if fin:
+                return b"".join(parts).decode()
+    
+    async def send_frame(self, opcode, payload):
+        """Write one unmasked frame"""
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x80 | opcode, length])
+        elif length < 65536:
+            header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+        else:
+            header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+        async with self.send_lock:
+            if self.closed:
+                return
+            try:
+                self.writer.write(header + payload)
+                await self.writer.drain()
+            except (ConnectionError, RuntimeError):
+                self.closed = True
+    
+    async def send(self, message):
+        """Send a relay message as a text frame"""
+        await self.send_frame(TEXT, json.dumps(message).encode())
+
+
+class MockRelay:
+    """NIP-01 relay (EVENT/OK, REQ/EOSE, CLOSE) with injectable faults"""
+    
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, drop_rate=0.0,
+                 reject_rate=0.0, rate_limit=None, verify_ids=True, seed=None, max_limit=None):
+        self.host = host
+        self.port = port
+        # Every reply is delayed by latency plus up to jitter seconds
+        self.latency = latency
+        self.jitter = jitter
+        # Fraction of EVENTs that never get an OK, and that get OK false
+        self.drop_rate = drop_rate
+        self.reject_rate = reject_rate
+        # (events per second, burst) accepted before replying "rate-limited:"
+        self.rate_limit = rate_limit
+        self.verify_ids = verify_ids
+        # Most events one REQ filter returns, whatever limit it asks for
+        self.max_limit = max_limit
+        # Same seed, same faults
+        self.random = random.Random(seed)
+        
+        self.bucket = TokenBucket(*rate_limit) if rate_limit else None
+        self.events = {}         # id -> event
+        self.connections = set()
+        self.handlers = set()
+        # In-flight handle_message tasks, kept so they aren't collected mid-run
+        self.tasks = set()
+        self.server = None
+        self.stats = {"received": 0, "accepted": 0, "duplicate": 0, "invalid": 0,
+                      "rejected": 0, "rate_limited": 0, "dropped": 0, "requests": 0}
+    
+    @property
+    def url(self):
+        """ws:// URL to add to the agent's relay list"""
+        return f"ws://{self.host}:{self.port}"
+    
+    def info(self):
+        """NIP-11 relay information document"""
+        return {"name": "clawstr mock relay", "supported_nips": [1, 11], "software": "mockrelay.py"}
+    
+    async def start(self):
+        """Start listening; returns the relay URL"""
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.url
+    
+    async def close(self):
+        """Stop listening and drop every client"""
+        if self.server is not None:
+            self.server.close()
+        for connection in list(self.connections):
+            connection.closed = True
+            connection.writer.close()
+        # Let every handler see its connection end rather than be cancelled
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        # Replies still waiting out their latency have nobody to go to
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+            self.server = None
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def handle_client(self, reader, writer):
+        """Serve one websocket connection"""
+        connection = Connection(reader, writer)
+        self.handlers.add(asyncio.current_task())
+        try:
+            if not await connection.handshake(self):
+                return
+            self.connections.add(connection)
+            while True:
+                message = await connection.read_message()
+                if message is None:
+                    break
+                # Each message is answered on its own, so with jitter
+                # replies can overtake each other like on a real relay
+                task = asyncio.create_task(self.handle_message(connection, message))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            connection.closed = True
+            self.connections.discard(connection)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+    
+    async def delay(self):
+        """Wait out the configured latency and jitter"""
+        seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+    
+    async def handle_message(self, connection, message):
+        """Dispatch one client message"""
+        try:
+            command, *args = json.loads(message)
+        except (ValueError, TypeError):
+            await connection.send(["NOTICE", "invalid: could not parse message"])
+            return
+        
+        if command == "EVENT" and args:
+            await self.handle_event(connection, args[0])
+        elif command == "REQ" and args:
+            await self.handle_req(connection, args[0], args[1:])
+        elif command == "CLOSE" and args:
+            connection.subscriptions.pop(args[0], None)
+        else:
+            await connection.send(["NOTICE", f"unsupported: {command}"])
+    
+    async def handle_event(self, connection, event):
+        """Store an event and acknowledge it, unless a fault says otherwise"""
+        self.stats["received"] += 1
+        # Draw the faults up front so they depend only on the seed
+        dropped = self.random.random() < self.drop_rate
+        rejected = self.random.random() < self.reject_rate
+        await self.delay()
+        
+        event_id_hex = event.get("id", "")
+        if dropped:
+            self.stats["dropped"] += 1
+            return
+        if self.verify_ids and event_id(event) != event_id_hex:
+            self.stats["invalid"] += 1
+            await connection.send(["OK", event_id_hex, False, "invalid: event id does not match"])
+            return
+        if self.bucket is not None and not self.bucket.try_acquire():
+            self.stats["rate_limited"] += 1
+            await connection.send(["OK", event_id_hex, False, "rate-limited: slow down"])
+            return
+        if rejected:
+            self.stats["rejected"] += 1
+            await connection.send(["OK", event_id_hex, False, "error: injected failure"])
+            return
+        
+        if event_id_hex in self.events:
+            self.stats["duplicate"] += 1
+            await connection.send(["OK", event_id_hex, True, "duplicate: already have this event"])
+            return
+        self.events[event_id_hex] = event
+        self.stats["accepted"] += 1
+        await connection.send(["OK", event_id_hex, True, ""])
+        
+        # Live subscriptions see new events straight away
+        for other in list(self.connections):
+            for subscription_id, filters in list(other.subscriptions.items()):
+                if any(matches(event, f) for f in filters):
+                    await other.send(["EVENT", subscription_id, event])
+    
+    async def handle_req(self, connection, subscription_id, filters):
+        """Send stored matches newest first, EOSE, then keep the subscription live"""
+        self.stats["requests"] += 1
+        connection.subscriptions[subscription_id] = filters
+        await self.delay()
+        
+        sent = set()
+        for event_filter in filters:
+            found = [e for e in self.events.values() if matches(e, event_filter)]
+            found.sort(key=lambda e: e["created_at"], reverse=True)
+            limit = event_filter.get("limit", self.max_limit)
+            if self.max_limit is not None:
+                limit = min(limit, self.max_limit)
+            if limit is not None:
+                found = found[:limit]
+            for event in found:
+                if event["id"] not in sent:
+                    sent.add(event["id"])
+                    await connection.send(["EVENT", subscription_id, event])
+        await connection.send(["EOSE", subscription_id])
+
+
+# ============================================
+# STANDALONE RELAY
+# ============================================
+
+async def run_relays(args):
+    """Run one or more mock relays until interrupted"""
+    relays = [
+        MockRelay(args.host, args.port + n if args.port else 0, args.latency, args.jitter,
+                  args.drop_rate, args.reject_rate,
+                  (args.rate, args.burst) if args.rate else None, seed=args.seed, max_limit=args.max_limit)
+        for n in range(args.count)
+    ]
+    urls = [await relay.start() for relay in relays]
+    print(f"🦀 {len(relays)} mock relay(s) running:")
+    for url in urls:
+        print(f"   {url}")
+    print(f"\nPoint the agent at them: CLAWSTR_RELAYS={','.join(urls)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for relay in relays:
+            await relay.close()
+
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Mock Nostr relay for offline testing")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=0, help="first port (default: any free port)")
+    parser.add_argument("--count", type=int, default=1, help="relays to run on consecutive ports (default: 1)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds per reply")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of events never acknowledged")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of events answered OK false")
+    parser.add_argument("--rate", type=float, help="events per second accepted before rate-limited replies")
+    parser.add_argument("--burst", type=int, default=10, help="burst allowed on top of --rate (default: 10)")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible faults")
+    parser.add_argument("--max-limit", type=int, help="cap on events returned per REQ filter, like public relays")
+    try:
+        asyncio.run(run_relays(parser.parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - OUTBOX
+# A durable write-ahead log of signed events,
+# so nothing is lost when every relay fails
+# ============================================
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+
+class Outbox:
+    """SQLite write-ahead log of signed events and their relay acks"""
+    
+    def __init__(self, path="clawstr_outbox.db"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id TEXT PRIMARY KEY, json TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS acks ("
+                "event_id TEXT NOT NULL, relay TEXT NOT NULL, acked REAL NOT NULL, "
+                "PRIMARY KEY (event_id, relay))"
+            )
+        
+        # Writes waiting for the next group commit: (sql, params, future)
+        self.writes = []
+        self.wakeup = None
+        self.flusher = None
+    
+    def start(self):
+        """Start the background group-commit task"""
+        if self.flusher is None:
+            self.wakeup = asyncio.Event()
+            self.flusher = asyncio.create_task(self.run())
+    
+    async def record(self, event_id, event_json):
+        """Durably store a signed event; returns once it is on disk"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.writes.append((
+            "INSERT OR IGNORE INTO events (id, json, created) VALUES (?, ?, ?)",
+            (event_id, event_json, time.time()),
+            future
+        ))
+        self.wakeup.set()
+        await future
+    
+    def ack(self, event_id, relay):
+        """Mark an event as accepted by a relay (committed with the next batch)"""
+        self.start()
+        self.writes.append((
+            "INSERT OR IGNORE INTO acks (event_id, relay, acked) VALUES (?, ?, ?)",
+            (event_id, relay, time.time()),
+            None
+        ))
+        self.wakeup.set()
+    
+    async def run(self):
+        """Commit queued writes in batches, one fsync per batch"""
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            
+            # Everything queued while the last commit ran goes out together
+            batch, self.writes = self.writes, []
+            if not batch:
+                continue
+            try:
+                await asyncio.to_thread(self.commit, batch)
+            except asyncio.CancelledError:
+                # Closing mid-commit: hand the batch back so close() can
+                # finish it (the inserts are idempotent)
+                self.writes[:0] = batch
+                raise
+            except Exception as e:
+                self.settle(batch, e)
+                continue
+            self.settle(batch)
+    
+    def commit(self, batch):
+        """Write one batch in a single transaction"""
+        with self.lock, self.db:
+            for sql, params, _ in batch:
+                self.db.execute(sql, params)
+    
+    def settle(self, batch, error=None):
+        """Wake up everyone waiting on a committed (or failed) batch"""
+        for _, _, future in batch:
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+    
+    def pending(self):
+        """Signed events that no relay has acknowledged yet, oldest first"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT json FROM events WHERE id NOT IN (SELECT event_id FROM acks) "
+                "ORDER BY created"
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def acked_relays(self, event_id):
+        """Relays that have acknowledged an event"""
+        with self.lock:
+            rows = self.db.execute("SELECT relay FROM acks WHERE event_id = ?", (event_id,)).fetchall()
+        return {row[0] for row in rows}
+    
+    def prune(self, older_than=7 * 24 * 3600):
+        """Forget acknowledged events older than the given age in seconds"""
+        cutoff = time.time() - older_than
+        with self.lock, self.db:
+            self.db.execute(
+                "DELETE FROM events WHERE created < ? AND id IN (SELECT event_id FROM acks)",
+                (cutoff,)
+            )
+            self.db.execute("DELETE FROM acks WHERE event_id NOT IN (SELECT id FROM events)")
+    
+    async def close(self):
+        """Commit anything still queued and close the database"""
+        if self.flusher is not None:
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except asyncio.CancelledError:
+                pass
+            self.flusher = None
+        
+        batch, self.writes = self.writes, []
+        if batch:
+            self.commit(batch)
+            self.settle(batch)
+        with self.lock:
+            self.db.close()
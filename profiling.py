@@ -0,0 +1,185 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - PROFILING HOOKS
+# Opt-in cProfile / tracemalloc sampling around
+# respond() and the publish path, reported at
+# exit; free when switched off
+# Env: CLAWSTR_PROFILE=cpu,memory (or all)
+#      CLAWSTR_PROFILE_SAMPLE=N  profile every Nth call (default: 1)
+#      CLAWSTR_PROFILE_OUT=PATH  also dump the cProfile stats there
+# ============================================
+
+import atexit
+import functools
+import os
+import sys
+import time
+
+MODES = ["cpu", "memory"]
+
+# The active Profiler, or None when profiling is off
+profiler = None
+
+
+def parse_modes(value):
+    """Parse "cpu,memory" (or "all") into a list of modes"""
+    modes = []
+    for mode in (value or "").replace(" ", "").lower().split(","):
+        if mode in ("all", "1", "yes", "true"):
+            return list(MODES)
+        if mode in MODES:
+            modes.append(mode)
+        elif mode:
+            raise ValueError(f"unknown profiling mode {mode!r} (use {', '.join(MODES)} or all)")
+    return modes
+
+
+class HookStats:
+    """Calls, time and retained memory for one hooked function"""
+    
+    __slots__ = ("calls", "sampled", "seconds", "allocated")
+    
+    def __init__(self):
+        self.calls = 0
+        self.sampled = 0
+        self.seconds = 0.0
+        self.allocated = 0
+
+
+class Profiler:
+    """One cProfile and/or tracemalloc session shared by every hook"""
+    
+    def __init__(self, modes, sample_every=1, out=None):
+        self.modes = modes
+        self.sample_every = max(1, sample_every)
+        self.out = out
+        self.hooks = {}
+        self.depth = 0
+        self.cpu = None
+        if "cpu" in modes:
+            import cProfile
+            self.cpu = cProfile.Profile()
+        if "memory" in modes:
+            import tracemalloc
+            tracemalloc.start()
+            self.memory_start = tracemalloc.take_snapshot()
+    
+    def start(self, name):
+        """Begin a call; returns a token, or None if this call isn't sampled"""
+        stats = self.hooks.get(name)
+        if stats is None:
+            stats = self.hooks[name] = HookStats()
+        stats.calls += 1
+        if stats.calls % self.sample_every:
+            return None
+        
+        # Calls overlap (nested hooks, concurrent sends), so the profiler
+        # runs from the first sampled call in until the last one is out
+        self.depth += 1
+        if self.depth == 1 and self.cpu is not None:
+            self.cpu.enable()
+        allocated = 0
+        if "memory" in self.modes:
+            import tracemalloc
+            allocated = tracemalloc.get_traced_memory()[0]
+        return stats, time.perf_counter(), allocated
+    
+    def stop(self, token):
+        """End a sampled call"""
+        stats, started, allocated = token
+        stats.sampled += 1
+        stats.seconds += time.perf_counter() - started
+        if "memory" in self.modes:
+            import tracemalloc
+            stats.allocated += tracemalloc.get_traced_memory()[0] - allocated
+        self.depth -= 1
+        if self.depth == 0 and self.cpu is not None:
+            self.cpu.disable()
+    
+    def report(self, stream=None):
+        """Per-hook summary, then the hottest functions and allocation sites"""
+        stream = stream or sys.stderr
+        print(f"\n📈 Profile ({', '.join(self.modes)}, every {self.sample_every} call(s))", file=stream)
+        for name, stats in sorted(self.hooks.items()):
+            mean_ms = stats.seconds / stats.sampled * 1000 if stats.sampled else 0.0
+            line = f"   {name:22} {stats.calls:8} calls {stats.sampled:8} sampled {mean_ms:9.3f} ms mean"
+            if "memory" in self.modes:
+                line += f" {stats.allocated / 1024:10.1f} KiB retained"
+            print(line, file=stream)
+        
+        if self.cpu is not None:
+            import pstats
+            stats = pstats.Stats(self.cpu, stream=stream)
+            if stats.stats:
+                print("\n🔥 Hottest functions (cumulative time):", file=stream)
+                stats.sort_stats("cumulative").print_stats(25)
+            if self.out:
+                stats.dump_stats(self.out)
+                print(f"💾 cProfile stats written to {self.out}", file=stream)
+        
+        if "memory" in self.modes:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"\n🧠 Traced memory: {current / 1024:.0f} KiB now, {peak / 1024:.0f} KiB peak", file=stream)
+            # Leave out what the profilers themselves allocate
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+            if self.cpu is not None:
+                import cProfile
+                import pstats
+                ignore += [tracemalloc.Filter(False, cProfile.__file__), tracemalloc.Filter(False, pstats.__file__)]
+            snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+            growth = snapshot.compare_to(self.memory_start.filter_traces(ignore), "lineno")
+            for stat in growth[:15]:
+                print(f"   {stat}", file=stream)
+
+
+def enable(modes, sample_every=1, out=None):
+    """Turn profiling on for hooks defined from now on, reporting at exit"""
+    global profiler
+    if isinstance(modes, str):
+        modes = parse_modes(modes)
+    if not modes or profiler is not None:
+        return profiler
+    profiler = Profiler(modes, sample_every, out)
+    atexit.register(profiler.report)
+    return profiler
+
+
+def hook(name):
+    """Decorator: profile a function (or coroutine function) when profiling is on"""
+    def decorate(function):
+        # Off (the default): hand back the function itself, at no cost per call
+        if profiler is None:
+            return function
+        
+        import inspect
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def profiled_async(*args, **kwargs):
+                token = profiler.start(name)
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    if token is not None:
+                        profiler.stop(token)
+            return profiled_async
+        
+        @functools.wraps(function)
+        def profiled(*args, **kwargs):
+            token = profiler.start(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if token is not None:
+                    profiler.stop(token)
+        return profiled
+    
+    return decorate
+
+
+# Hooks are applied when modules load, so the switch is read at import
+if os.environ.get("CLAWSTR_PROFILE"):
+    enable(
+        os.environ["CLAWSTR_PROFILE"],
+        int(os.environ.get("CLAWSTR_PROFILE_SAMPLE", "1")),
+        os.environ.get("CLAWSTR_PROFILE_OUT")
+    )
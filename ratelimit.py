@@ -0,0 +1,91 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - RATE LIMITING
+# Token buckets that pace outbound events per
+# relay and per identity, backing off when a
+# relay says "rate-limited"
+# ============================================
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket; waiting callers queue up without blocking the loop"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def refill(self):
+        """Add the tokens earned since the last call"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self):
+        """Take a token if one is free right now, without waiting"""
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    async def acquire(self):
+        """Take one token, sleeping until one is free if the bucket is empty"""
+        while True:
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            # Re-check on waking: the rate may have changed while we slept
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveBucket(TokenBucket):
+    """Token bucket that finds the highest rate a relay accepts: halves when limited, regrows fast up to near that rate"""
+    
+    def __init__(self, rate, burst, min_rate=0.2, max_rate=50.0, increase=0.1, decrease=0.5):
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.limited = 0
+        self.last_decrease = 0.0
+        # The rate the relay last limited us at, None until it does (or
+        # once we are well past it): away from it, grow fast to find it
+        self.ceiling = None
+    
+    def on_success(self):
+        """Raise the rate: doubling per second away from the ceiling, by `increase` of itself near it"""
+        if self.ceiling is not None and self.rate > self.ceiling * 1.25:
+            # Accepted well past where we were limited, so that limit is gone
+            self.ceiling = None
+        near = self.ceiling is not None and self.rate >= self.ceiling * 0.9
+        # Called once per accepted event, so these steps add up per second
+        step = self.increase if near else 1
+        self.rate = min(self.max_rate, self.rate + step)
+    
+    def on_limited(self, started=None):
+        """Halve the rate and empty the bucket after a rate-limited reply to a send made at `started`"""
+        self.limited += 1
+        self.refill()
+        # Sends that left before the last decrease were paced at the old
+        # rate and get limited together; they are one signal, not one
+        # halving each
+        if started is None or started >= self.last_decrease:
+            self.ceiling = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.last_decrease = time.monotonic()
+        self.tokens = min(self.tokens, 0)
+    
+    def report(self):
+        """Current pacing state"""
+        return {"rate": round(self.rate, 3), "tokens": round(self.tokens, 2), "limited": self.limited}
+
+
+def is_rate_limited(message):
+    """Whether a relay's OK false / CLOSED message means "slow down" (NIP-01 prefix)"""
+    return str(message).strip().lower().startswith("rate-limited")
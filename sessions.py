@@ -0,0 +1,106 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - CONVERSATIONS
+# Per-correspondent state (last intent, turns,
+# topics covered) with TTL and LRU eviction
+# under a hard cap on how many are kept
+# ============================================
+
+from collections import OrderedDict
+import time
+
+
+class Session:
+    """What we remember about one conversation, in a few machine words"""
+    
+    __slots__ = ("key", "last_intent", "turns", "topics", "last_seen")
+    
+    def __init__(self, key=None):
+        self.key = key
+        self.last_intent = None
+        self.turns = 0
+        # Bit mask of covered topics (see SessionStore.topic_bit)
+        self.topics = 0
+        self.last_seen = time.monotonic()
+    
+    def record(self, intent, topic_bit=0):
+        """Remember one answered turn"""
+        self.last_intent = intent
+        self.turns += 1
+        self.topics |= topic_bit
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """LRU map of conversation key (e.g. pubkey hex) -> Session, expiring idle ones"""
+    
+    # Intent names get one bit each in Session.topics, shared by every store
+    TOPIC_BITS = {}
+    
+    def __init__(self, max_sessions=200000, ttl=3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        
+        # key -> Session, least recently used first
+        self.sessions = OrderedDict()
+        
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+    
+    @classmethod
+    def topic_bit(cls, intent):
+        """The Session.topics bit for an intent"""
+        bit = cls.TOPIC_BITS.get(intent)
+        if bit is None:
+            bit = cls.TOPIC_BITS[intent] = 1 << len(cls.TOPIC_BITS)
+        return bit
+    
+    @classmethod
+    def topic_names(cls, topics):
+        """Intent names set in a Session.topics mask"""
+        return [intent for intent, bit in cls.TOPIC_BITS.items() if topics & bit]
+    
+    def get(self, key):
+        """The session for a key, starting a fresh one if it is new or expired"""
+        now = time.monotonic()
+        self.expire(now)
+        session = self.sessions.get(key)
+        if session is not None:
+            # Keeps the dict ordered by last_seen, which expire() relies on
+            session.last_seen = now
+            self.sessions.move_to_end(key)
+            return session
+        
+        session = self.sessions[key] = Session(key)
+        self.created += 1
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+    
+    def expire(self, now=None):
+        """Drop sessions idle for longer than the TTL"""
+        if now is None:
+            now = time.monotonic()
+        # Least recently used first, so stop at the first live one
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if now - session.last_seen <= self.ttl:
+                break
+            self.sessions.popitem(last=False)
+            self.expired += 1
+    
+    def __len__(self):
+        return len(self.sessions)
+    
+    def __contains__(self, key):
+        return key in self.sessions
+    
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            "sessions": len(self.sessions),
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
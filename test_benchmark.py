@@ -0,0 +1,27 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - BENCHMARK TESTS
+# Baseline comparison, including metrics whose
+# baseline is 0
+# Run: python -m pytest -q test_benchmark.py
+# ============================================
+
+from benchmark import compare
+
+
+def test_relative_changes_are_flagged_past_the_tolerance(capsys):
+    baseline = {"respond": {"p50_us": 10.0, "messages_per_s": 1000.0}}
+    assert compare({"respond": {"p50_us": 12.0, "messages_per_s": 900.0}}, baseline) == []
+    assert compare({"respond": {"p50_us": 8.0, "messages_per_s": 1500.0}}, baseline) == []
+    assert compare({"respond": {"p50_us": 13.0, "messages_per_s": 700.0}}, baseline) == [
+        "respond.messages_per_s", "respond.p50_us"
+    ]
+
+
+def test_zero_baselines_use_an_absolute_tolerance(capsys):
+    baseline = {"renderers": {"introduce": {"cached_net_bytes": 0}}, "publish": {"failed": 0}}
+    # tracemalloc noise either way, and fewer bytes, are fine
+    assert compare({"renderers": {"introduce": {"cached_net_bytes": -16}}, "publish": {"failed": 0}}, baseline) == []
+    assert compare({"renderers": {"introduce": {"cached_net_bytes": 32}}, "publish": {"failed": 0}}, baseline) == []
+    assert compare({"renderers": {"introduce": {"cached_net_bytes": 50000}}, "publish": {"failed": 1}}, baseline) == [
+        "publish.failed", "renderers.introduce.cached_net_bytes"
+    ]
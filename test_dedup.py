@@ -0,0 +1,50 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - EVENT DEDUP TESTS
+# Exact recent set, Bloom filter generations,
+# and what rotation forgets
+# Run: python -m pytest -q test_dedup.py
+# ============================================
+
+from dedup import EventDeduplicator
+import hashlib
+
+
+def event_ids(count):
+    """Distinct, repeatable 64-hex event ids"""
+    return [hashlib.sha256(n.to_bytes(8, "little")).hexdigest() for n in range(count)]
+
+
+def test_ids_leaving_the_recent_set_are_still_seen():
+    dedup = EventDeduplicator(max_recent=2, bloom_capacity=100)
+    ids = event_ids(5)
+    assert [dedup.seen(event_id) for event_id in ids] == [False] * 5
+    assert list(dedup.recent) == ids[-2:]
+    
+    assert all(dedup.seen(event_id) for event_id in ids)
+    assert dedup.stats()["hits"] == 2
+    assert dedup.stats()["bloom_hits"] == 3
+
+
+def test_rotation_forgets_the_oldest_generation():
+    dedup = EventDeduplicator(max_recent=1, bloom_capacity=3)
+    ids = event_ids(8)
+    for event_id in ids:
+        dedup.seen(event_id)
+    
+    # ids[0:3] filled the first generation and ids[3:6] the second; when
+    # ids[6] was archived the first one was dropped
+    assert all(event_id in dedup.previous for event_id in ids[3:6])
+    assert ids[6] in dedup.current
+    assert not dedup.seen(ids[0])
+    assert dedup.seen(ids[4])
+    # Memory stays at two filters, however many ids went through
+    assert dedup.memory_bytes() == len(dedup.current.bits) * 2
+
+
+def test_ids_expire_from_the_recent_set_after_the_ttl():
+    dedup = EventDeduplicator(ttl=0)
+    first, second = event_ids(2)
+    dedup.seen(first)
+    dedup.seen(second)
+    assert first not in dedup.recent
+    assert dedup.seen(first)
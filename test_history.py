@@ -0,0 +1,68 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - HISTORY SYNC TESTS
+# Paging a subclaw's history out of a mock relay
+# that caps how many events one REQ returns
+# Run: python -m pytest -q test_history.py
+# ============================================
+
+from mockrelay import MockRelay
+import asyncio
+import json
+import nostr_sdk
+
+SUBCLAW = "https://clawstr.com/c/ai"
+
+
+def store_posts(relay, agent, count, start):
+    """Put signed subclaw posts one second apart straight into the relay"""
+    for n in range(count):
+        builder = (
+            nostr_sdk.EventBuilder(nostr_sdk.Kind(1111), f"post {start + n}")
+            .tags(agent.subclaw_tags(SUBCLAW))
+            .custom_created_at(nostr_sdk.Timestamp.from_secs(start + n))
+        )
+        event = json.loads(builder.sign_with_keys(agent.keys).as_json())
+        relay.events[event["id"]] = event
+
+
+def test_sync_pages_past_relay_limit_cap(make_agent):
+    async def scenario():
+        async with MockRelay(max_limit=100) as relay:
+            agent = make_agent(relay.url)
+            agent.use_history(":memory:")
+            try:
+                await agent.connect()
+                store_posts(relay, agent, 300, 1700000000)
+                first = await agent.sync_history([SUBCLAW], page_size=500)
+                again = await agent.sync_history([SUBCLAW], page_size=500)
+                
+                store_posts(relay, agent, 5, 1700001000)
+                newer = await agent.sync_history([SUBCLAW], page_size=500)
+                return first, again, newer, agent.history.since(relay.url, SUBCLAW)
+            finally:
+                await agent.close()
+    
+    first, again, newer, cursor = asyncio.run(scenario())
+    assert (first, again, newer) == (300, 0, 5)
+    assert cursor == 1700001004
+
+
+def test_sync_pages_each_relay_past_shared_posts(make_agent):
+    async def scenario():
+        async with MockRelay(max_limit=100) as shared, MockRelay(max_limit=100, latency=0.05) as longer:
+            agent = make_agent(shared.url, longer.url)
+            agent.use_history(":memory:")
+            try:
+                await agent.connect(quorum=2)
+                # Both relays hold the newest 200; only the second, slower one goes
+                # further back, and its first page is all posts already stored
+                store_posts(shared, agent, 200, 1700000000)
+                longer.events.update(shared.events)
+                store_posts(longer, agent, 50, 1699990000)
+                first = await agent.sync_history([SUBCLAW], page_size=500)
+                again = await agent.sync_history([SUBCLAW], page_size=500)
+                return first, again
+            finally:
+                await agent.close()
+    
+    assert asyncio.run(scenario()) == (250, 0)
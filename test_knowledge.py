@@ -0,0 +1,34 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - KNOWLEDGE BASE TESTS
+# Lazy sections read safely while the knowledge
+# file is rewritten underneath them
+# Run: python -m pytest -q test_knowledge.py
+# ============================================
+
+from knowledge import KnowledgeBase
+import json
+import pytest
+
+
+def write_sections(path, count, tag):
+    """Rewrite the file in place, as an editor or `echo >` would"""
+    with open(path, "w") as f:
+        for n in range(count):
+            f.write(json.dumps({"section": f"s{n}", "data": {"text": f"{tag} {n} " + "x" * 200}}) + "\n")
+
+
+def test_sections_follow_an_in_place_rewrite(tmp_path):
+    path = tmp_path / "knowledge.jsonl"
+    write_sections(path, 3000, "old")
+    knowledge = KnowledgeBase(path, check_interval=3600)
+    assert knowledge["s1"]["text"].startswith("old 1 ")
+    
+    # Shorter now, and no refresh() yet: reads must not run past the new end
+    write_sections(path, 10, "new")
+    assert knowledge["s5"]["text"].startswith("new 5 ")
+    with pytest.raises(KeyError):
+        knowledge["s2000"]
+    
+    # The rescan on access is still reported to the next refresh()
+    assert {"s1", "s2000"} <= knowledge.refresh()
+    assert knowledge["s1"]["text"].startswith("new 1 ")
@@ -0,0 +1,113 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - LISTENER TESTS
+# Mentions and subclaw questions answered over
+# a local mock relay, with threaded reply tags
+# Run: python -m pytest -q test_listener.py
+# ============================================
+
+from mockrelay import MockRelay
+import asyncio
+import json
+import nostr_sdk
+
+
+async def wait_for(condition, timeout=5.0):
+    """Poll until condition() holds or the timeout runs out"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition() and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+    return condition()
+
+
+def tag_lists(event):
+    """An event's tags as plain lists"""
+    return [tag.as_vec() for tag in event.tags().to_vec()]
+
+
+def test_receive_queues_only_events_for_us(make_agent):
+    bot = make_agent()
+    bot.inbox = asyncio.Queue(10)
+    stranger = nostr_sdk.Keys.generate()
+    bot_hex = bot.keys.public_key().to_hex()
+    
+    chatter = bot.build_post("random chatter not for the bot")
+    own = bot.build_post(f"{bot.name}, talking to myself")
+    named = nostr_sdk.EventBuilder.text_note(f"Hey {bot.name}, what is clawstr?").sign_with_keys(stranger)
+    tagged = nostr_sdk.EventBuilder.text_note("hi").tags([nostr_sdk.Tag.parse(["p", bot_hex])]).sign_with_keys(stranger)
+    for event in (chatter, own, named, tagged):
+        bot.receive(event)
+    
+    queued = [bot.inbox.get_nowait() for _ in range(bot.inbox.qsize())]
+    assert [event.id().to_hex() for event in queued] == [named.id().to_hex(), tagged.id().to_hex()]
+
+
+def test_follow_ups_are_answered_up_to_the_reply_rate(make_agent):
+    bot = make_agent()
+    user = nostr_sdk.Keys.generate()
+    other = nostr_sdk.Keys.generate()
+    question = nostr_sdk.EventBuilder.text_note("what is clawstr?").sign_with_keys(user)
+    follow_up = nostr_sdk.EventBuilder.text_note("tell me more").sign_with_keys(user)
+    
+    # A few quick follow-ups from one author go through, then the rest wait
+    burst = bot.reply_rate[1]
+    assert [bot.should_answer(follow_up if n else question) for n in range(burst + 1)] == [True] * burst + [False]
+    # Other authors have their own allowance
+    assert bot.should_answer(nostr_sdk.EventBuilder.text_note("hi").sign_with_keys(other))
+
+
+def test_replies_are_threaded(make_agent):
+    async def scenario():
+        async with MockRelay() as relay:
+            bot = make_agent(relay.url)
+            user = make_agent(relay.url)
+            try:
+                await bot.connect()
+                await user.connect()
+                await bot.start_listener()
+                # Let both subscriptions reach the relay before posting
+                await wait_for(lambda: relay.stats["requests"] >= 2)
+                
+                # The mention comes from a second author
+                bot_hex = bot.keys.public_key().to_hex()
+                stranger = nostr_sdk.Keys.generate()
+                mention = (
+                    nostr_sdk.EventBuilder.text_note("what is nostr?")
+                    .tags([nostr_sdk.Tag.parse(["p", bot_hex])])
+                    .sign_with_keys(stranger)
+                )
+                question = user.build_post(f"Hey {bot.name}, what is clawstr?")
+                chatter = user.build_post("random chatter not for the bot")
+                for event in (mention, question, chatter):
+                    await user.send_post(event)
+                
+                assert await wait_for(lambda: bot.replies_sent >= 2)
+                await asyncio.sleep(0.2)
+                assert bot.replies_sent == 2
+            finally:
+                await bot.close()
+                await user.close()
+            
+            replies = [
+                nostr_sdk.Event.from_json(json.dumps(event))
+                for event in relay.events.values() if event["pubkey"] == bot_hex
+            ]
+            return mention, question, replies
+    
+    mention, question, replies = asyncio.run(scenario())
+    by_kind = {reply.kind().as_u16(): reply for reply in replies}
+    assert sorted(by_kind) == [1, 1111]
+    
+    # NIP-10: a kind 1 reply marks the note it answers and tags its author
+    note_tags = tag_lists(by_kind[1])
+    assert any(tag[:2] == ["e", mention.id().to_hex()] and tag[3] in ("root", "reply") for tag in note_tags)
+    assert ["p", mention.author().to_hex()] in note_tags
+    
+    # NIP-22: a comment keeps the subclaw root scope and points at its parent
+    comment_tags = tag_lists(by_kind[1111])
+    question_tags = tag_lists(question)
+    user_hex = question.author().to_hex()
+    assert [tag for tag in comment_tags if tag[0] in ("I", "K")] == [tag for tag in question_tags if tag[0] in ("I", "K")]
+    assert ["e", question.id().to_hex(), "", user_hex] in comment_tags
+    assert ["k", "1111"] in comment_tags
+    assert ["p", user_hex] in comment_tags
@@ -0,0 +1,30 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - LOGGING TESTS
+# Secret keys masked whether or not setup()
+# installed our handlers
+# Run: python -m pytest -q test_logs.py
+# ============================================
+
+import logging
+import logs
+import nostr_sdk
+
+
+def test_keys_are_masked_without_setup(caplog):
+    nsec = nostr_sdk.Keys.generate().secret_key().to_bech32()
+    log = logs.get_logger("test")
+    details = {"keys": [nsec], "nested": {"nsec": nsec}}
+    
+    with caplog.at_level(logging.WARNING):
+        log.warning("loaded %s", nsec, extra={"details": details})
+        try:
+            raise ValueError(f"bad key {nsec}")
+        except ValueError:
+            log.exception("failed")
+    
+    assert nsec not in caplog.text
+    assert caplog.records[0].getMessage() == f"loaded {logs.REDACTED}"
+    assert caplog.records[0].details == {"keys": [logs.REDACTED], "nested": {"nsec": logs.REDACTED}}
+    assert f"ValueError: bad key {logs.REDACTED}" in caplog.text
+    # The caller's own objects are left alone
+    assert details["keys"] == [nsec]
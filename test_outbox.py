@@ -0,0 +1,101 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - OUTBOX TESTS
+# Write-ahead log of signed events: group
+# commits, acks, and replay after a restart
+# Run: python -m pytest -q test_outbox.py
+# ============================================
+
+from mockrelay import MockRelay
+from outbox import Outbox
+import asyncio
+
+
+def test_pending_events_survive_close_and_reopen(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    
+    async def write():
+        outbox = Outbox(path)
+        for n in range(3):
+            await outbox.record(f"id{n}", f'{{"n": {n}}}')
+        outbox.ack("id1", "wss://a")
+        outbox.ack("id1", "wss://b")
+        # Acks are queued for the next group commit; close() writes them
+        await outbox.close()
+    
+    asyncio.run(write())
+    outbox = Outbox(path)
+    try:
+        assert outbox.pending() == ['{"n": 0}', '{"n": 2}']
+        assert outbox.acked_relays("id1") == {"wss://a", "wss://b"}
+        assert outbox.acked_relays("id0") == set()
+    finally:
+        outbox.db.close()
+
+
+def test_concurrent_records_share_commits(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    batches = []
+    commit = outbox.commit
+    
+    def counting_commit(batch):
+        batches.append(len(batch))
+        commit(batch)
+    
+    outbox.commit = counting_commit
+    
+    async def write():
+        await asyncio.gather(*(outbox.record(f"id{n}", "{}") for n in range(200)))
+        await outbox.close()
+    
+    asyncio.run(write())
+    assert sum(batches) == 200
+    # Writes queued while a commit runs go out together in the next one
+    assert len(batches) < 200
+
+
+def test_restart_replays_only_unacknowledged_events(tmp_path, make_agent):
+    path = str(tmp_path / "outbox.db")
+    
+    async def scenario():
+        async with MockRelay() as relay:
+            agent = make_agent(relay.url)
+            agent.pubkey_rate = None
+            agent.use_outbox(path)
+            try:
+                await agent.connect()
+                delivered = await agent.send_post(agent.build_post("this one gets through"))
+                
+                # The relay turns every event down from here on
+                relay.reject_rate = 1.0
+                failed = [agent.build_post(f"stuck {n}") for n in range(2)]
+                for event in failed:
+                    try:
+                        await agent.send_post(event)
+                    except RuntimeError:
+                        pass
+            finally:
+                await agent.close()
+            
+            # Restart with the same identity; connecting replays the outbox
+            relay.reject_rate = 0.0
+            received = relay.stats["received"]
+            restarted = make_agent(relay.url, keys=agent.keys)
+            restarted.use_outbox(path)
+            try:
+                await restarted.connect()
+                replayed = relay.stats["received"] - received
+            finally:
+                await restarted.close()
+            return delivered, failed, relay.events, replayed
+    
+    delivered, failed, stored, replayed = asyncio.run(scenario())
+    # The stored signed events went out as they were: same ids, not re-signed
+    assert set(stored) == {delivered.id().to_hex()} | {event.id().to_hex() for event in failed}
+    # The acknowledged event was not sent again
+    assert replayed == len(failed)
+    # Their acks were committed when the agent closed
+    outbox = Outbox(path)
+    try:
+        assert outbox.pending() == []
+    finally:
+        outbox.db.close()
@@ -0,0 +1,61 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - RATE LIMITING TESTS
+# Adaptive pacing settling near the rate a mock
+# relay accepts
+# Run: python -m pytest -q test_ratelimit.py
+# ============================================
+
+from mockrelay import MockRelay
+from ratelimit import AdaptiveBucket
+import asyncio
+import time
+
+
+def test_sends_in_flight_count_as_one_signal():
+    bucket = AdaptiveBucket(16.0, 10)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.on_limited(started)
+    assert bucket.rate == 8.0
+    assert bucket.limited == 5
+    
+    # A send that left after the decrease is a new signal
+    bucket.on_limited(time.monotonic())
+    assert bucket.rate == 4.0
+
+
+def test_rate_regrows_fast_to_near_the_last_limit():
+    bucket = AdaptiveBucket(20.0, 10)
+    bucket.on_limited()
+    # One step per accepted event while well below where we were limited
+    for _ in range(8):
+        bucket.on_success()
+    assert bucket.rate == 18.0
+    
+    # Near it, each step is `increase` (a tenth of an event)
+    bucket.on_success()
+    assert abs(bucket.rate - 18.1) < 1e-9
+
+
+def test_publishing_settles_near_the_relay_limit(make_agent):
+    limit = 40.0
+    
+    async def scenario():
+        async with MockRelay(rate_limit=(limit, 5)) as relay:
+            agent = make_agent(relay.url)
+            agent.pubkey_rate = None
+            try:
+                await agent.connect()
+                await agent.start_publisher()
+                # Warm up: find the limit from the default starting rate
+                await agent.publish_many([(f"warm up {n}", None) for n in range(100)])
+                
+                started = time.perf_counter()
+                results = await agent.publish_many([(f"post {n}", None) for n in range(150)])
+                elapsed = time.perf_counter() - started
+            finally:
+                await agent.close()
+            assert not [result for result in results if isinstance(result, Exception)]
+            return 150 / elapsed
+    
+    assert asyncio.run(scenario()) >= limit * 0.75
@@ -0,0 +1,39 @@
+# ============================================
+# CLAWSTR EDUCATOR AGENT - CONVERSATION TESTS
+# SessionStore expiry and eviction
+# Run: python -m pytest -q test_sessions.py
+# ============================================
+
+from sessions import SessionStore
+import sessions
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    alice = store.get("alice")
+    store.get("bob")
+    assert store.get("alice") is alice
+    
+    store.get("carol")
+    assert "bob" not in store
+    assert "alice" in store and "carol" in store
+    assert store.stats() == {"sessions": 2, "created": 3, "expired": 0, "evicted": 1}
+
+
+def test_idle_sessions_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, "monotonic", lambda: now[0])
+    store = SessionStore(ttl=60)
+    alice = store.get("alice")
+    alice.record("clawstr", SessionStore.topic_bit("clawstr"))
+    now[0] += 30
+    store.get("bob")
+    
+    # Alice was idle for 61 s, Bob for 31 s
+    now[0] += 31
+    store.expire()
+    assert "alice" not in store and "bob" in store
+    assert store.stats()["expired"] == 1
+    
+    # Coming back starts a fresh conversation
+    assert store.get("alice").turns == 0